@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Vectorized valuation analytics.
+
+Turns fetched stock items into finished records in one NumPy pass over a
+(tickers x quarters) matrix: the P/E history, the P/E percentile,
+the similar-P/E case search behind histPerformance, and the value score.
+No I/O happens here, so the whole universe can be recomputed under new
+parameters without touching the network.
+
+A fetched item looks like
+    {"record": {... display fields, analytics left empty ...},
+     "inputs": {"price", "pe", "forwardPE", "pb", "ps", "peg"},   # unrounded
+     "history": {"months": ["YYYY-MM", ...], "close": [...]}}   # or "pe": [...]
+where "close" holds quarterly closes and "pe" holds an already computed P/E
+series (used when repricing a previous record). With reported quarterly EPS
+(``reports`` in build_records, see earnings.py) a bar's P/E is its close
+over the trailing four quarters' EPS known at the time; bars the reports do
+not cover fall back to the estimate pe * close / price, which holds
+earnings at today's.
+Closed quarters for which the snapshot store recorded a real P/E use that
+instead of the estimate (see ``observed`` in build_records).
+
+The quarter still in progress closes at today's price, so it always takes
+today's P/E (the record's pe), as does the trailing anchor; repriced and
+fully fetched records therefore end on the same point. The reports are
+Yahoo's "Reported EPS", the adjusted figure analysts compare against,
+while trailingPE is on a GAAP basis: closed quarters with reports can sit
+on a different earnings basis from today's P/E where the two differ
+(write-downs, one-off gains).
+"""
+import time
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+PE_MAX = 500          # P/E points outside (0, PE_MAX) are ignored
+SIMILAR_BAND = 0.15   # "similar P/E" = within 15% of today's
+MIN_PERCENTILE_POINTS = 3
+MIN_CASE_POINTS = 5
+MAX_CASES = 6
+BAR_MONTHS = 3        # history bars are quarterly, labelled by their first month
+TTM_QUARTERS = 4
+TTM_MAX_SPAN = 12     # months from the first to the last of the quarters summed
+TTM_MAX_AGE = 6       # months from the latest report to a bar's last month
+
+
+@lru_cache(maxsize=4096)
+def month_index(label):
+    """'YYYY-MM' -> months since year 0."""
+    return int(label[:4]) * 12 + int(label[5:7]) - 1
+
+
+def month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _pad(rows, fill, dtype, width):
+    """Right-pad ragged rows into an (n, width) matrix."""
+    out = np.full((len(rows), width), fill, dtype=dtype)
+    for i, r in enumerate(rows):
+        if len(r):
+            out[i, :len(r)] = r
+    return out
+
+
+def _vector(items, key):
+    return np.array([item["inputs"].get(key) for item in items], dtype=float)
+
+
+def _truthy(a):
+    """Elementwise Python truthiness for float columns (None -> NaN -> False)."""
+    return ~np.isnan(a) & (a != 0)
+
+
+# ─── Kernels ───
+def estimate_pe(pe, price, closes):
+    """Historical P/E implied by price ratios, pe * close / price, rounded to 0.1.
+
+    Entries that are unusable (no close, no valid current P/E, or an
+    estimate outside (0, PE_MAX)) are NaN.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        est = pe[:, None] * (closes / price[:, None])
+    gate = (pe > 0) & (pe < PE_MAX)
+    ok = gate[:, None] & (closes > 0) & (est > 0) & (est < PE_MAX)
+    return np.where(ok, np.round(est, 1), np.nan)
+
+
+def trailing_eps(months, reports):
+    """Trailing-four-quarter EPS known when each bar closed (NaN if unknown).
+
+    ``reports`` is aligned with the rows: None or (report month indices,
+    EPS) ascending. A bar starting in month m sees the reports made before
+    month m + BAR_MONTHS. The quarters summed must span at most TTM_MAX_SPAN
+    months and the latest be at most TTM_MAX_AGE months old, so a gap in the
+    reports leaves NaN instead of a partial or stale sum.
+    """
+    n, width = months.shape
+    k = max((len(r[0]) for r in reports if r is not None), default=0)
+    if k < TTM_QUARTERS:
+        return np.full((n, width), np.nan)
+    q = TTM_QUARTERS
+    rep_months = _pad([r[0] if r is not None else [] for r in reports], np.iinfo(np.int64).max, np.int64, k)
+    rep_eps = _pad([r[1] if r is not None else [] for r in reports], np.nan, float, k)
+    sums = np.hstack([np.zeros((n, 1)), np.cumsum(rep_eps, axis=1)])
+    ttm = np.full((n, k), np.nan)
+    ttm[:, q - 1:] = sums[:, q:] - sums[:, :-q]
+    ttm[:, q - 1:][rep_months[:, q - 1:] - rep_months[:, :k - q + 1] > TTM_MAX_SPAN] = np.nan
+
+    ends = months + BAR_MONTHS
+    known = np.zeros((n, width), dtype=np.int64)
+    for j in range(k):
+        known += rep_months[:, j, None] < ends
+    latest = np.maximum(known - 1, 0)
+    age = ends - 1 - np.take_along_axis(rep_months, latest, axis=1)
+    ok = (months >= 0) & (known >= q) & (age <= TTM_MAX_AGE)
+    return np.where(ok, np.take_along_axis(ttm, latest, axis=1), np.nan)
+
+
+def real_pe(closes, eps):
+    """close / trailing EPS rounded to 0.1; NaN if undefined or outside (0, PE_MAX)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pe = closes / eps
+    ok = (eps > 0) & (closes > 0) & (pe < PE_MAX)
+    return np.where(ok, np.round(pe, 1), np.nan)
+
+
+def _reports(rows):
+    if not rows:
+        return None
+    return (np.array([month_index(day[:7]) for day, _ in rows], dtype=np.int64),
+            np.array([eps for _, eps in rows], dtype=float))
+
+
+def overlay_observed(values, months, observed, now_month):
+    """Replace estimated P/E of closed bars with recorded values, rounded to 0.1.
+
+    ``observed`` is aligned with the rows: None or (month indices, P/E)
+    ascending by month. A bar starting in month m takes the last valid
+    observation in [m, m + BAR_MONTHS), the window its close is taken from.
+    """
+    out = values.copy()
+    for i, obs in enumerate(observed):
+        if obs is None:
+            continue
+        obs_months, obs_pe = obs
+        ok = (obs_pe > 0) & (obs_pe < PE_MAX)
+        obs_months, obs_pe = obs_months[ok], obs_pe[ok]
+        if not len(obs_months):
+            continue
+        bars = months[i]
+        pos = np.searchsorted(obs_months, bars + BAR_MONTHS, side="left") - 1
+        hit = (bars >= 0) & (bars + BAR_MONTHS <= now_month) & (pos >= 0)
+        hit[hit] = obs_months[pos[hit]] >= bars[hit]
+        out[i, hit] = np.round(obs_pe[pos[hit]], 1)
+    return out
+
+
+def pin_current(values, months, pe, now_month):
+    """Set the bar still in progress to today's P/E, rounded like the anchor.
+
+    Rows without a P/E in (0, PE_MAX) today lose the bar instead (NaN).
+    """
+    # builtin round() on the scalar P/E, exactly as append_anchor
+    today = np.array([round(p, 1) if 0 < p < PE_MAX else np.nan for p in pe.tolist()])
+    live = (months >= 0) & (months > now_month - BAR_MONTHS)
+    return np.where(live, today[:, None], values)
+
+
+def compact(values, months):
+    """Left-justify the non-NaN entries of every row, keeping their order."""
+    valid = ~np.isnan(values)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    values = np.take_along_axis(values, order, axis=1)
+    months = np.take_along_axis(months, order, axis=1)
+    return values, months, valid.sum(axis=1)
+
+
+def append_anchor(values, months, lengths, pe, now_month):
+    """Append today's P/E as the last point unless the last bar is this month."""
+    n = len(pe)
+    values = np.hstack([values, np.full((n, 1), np.nan)])
+    months = np.hstack([months, np.full((n, 1), -1, dtype=months.dtype)])
+    rows = np.arange(n)
+    last = np.where(lengths > 0, months[rows, np.maximum(lengths - 1, 0)], -1)
+    add = (pe > 0) & (pe < PE_MAX) & ((lengths == 0) | (last != now_month))
+    # builtin round() on the scalar P/E, exactly as the per-ticker code did
+    values[rows[add], lengths[add]] = [round(float(p), 1) for p in pe[add]]
+    months[rows[add], lengths[add]] = now_month
+    return values, months, lengths + add
+
+
+def percentiles(values, lengths, pe):
+    """Percent of positive history points below today's P/E (NaN if undefined)."""
+    cols = np.arange(values.shape[1])
+    valid = (cols < lengths[:, None]) & (values > 0)
+    count = valid.sum(axis=1)
+    below = (valid & (values < pe[:, None])).sum(axis=1)
+    eligible = _truthy(pe) & (lengths >= MIN_PERCENTILE_POINTS) & (count > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(eligible, np.round(below / count * 100), np.nan)
+
+
+def similar_cases(values, lengths, pe):
+    """Quarters whose P/E was within SIMILAR_BAND of today's, and the change two quarters on.
+
+    Returns (mask, returns, count, avg_return, win_rate); the last three are
+    NaN/0 for rows without cases.
+    """
+    n, width = values.shape
+    cols = np.arange(width)
+    later = np.hstack([values[:, 2:], np.full((n, min(2, width)), np.nan)])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        near = np.abs(values - pe[:, None]) / pe[:, None] < SIMILAR_BAND
+        returns = np.round((later / values - 1) * 100, 1)
+    eligible = _truthy(pe) & (lengths >= MIN_CASE_POINTS)
+    mask = eligible[:, None] & (cols < lengths[:, None] - 2) & near
+    count = mask.sum(axis=1)
+    # cumsum adds left to right, matching the builtin sum() it replaces
+    total = np.cumsum(np.where(mask, returns, 0.0), axis=1)[:, -1] if width else np.zeros(n)
+    wins = (mask & (returns > 0)).sum(axis=1)
+    # builtin round() on each scalar mean, as the per-ticker code did; np.round
+    # scales by 10 first and lands on the other side of some .x5 ties
+    avg = np.array([round(t / c, 1) if c else np.nan for t, c in zip(total.tolist(), count.tolist())])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.round(wins / count * 100)
+    return mask, returns, count, avg, win_rate
+
+
+def value_scores(pe, fwd_pe, pb, ps, peg, discount):
+    """Mean of clamped 0-100 sub-scores; higher means cheaper. NaN if undefined."""
+    parts = [
+        (_truthy(pe), 100 - (pe / 50 * 100)),
+        (_truthy(fwd_pe), 100 - (fwd_pe / 40 * 100)),
+        (_truthy(pb), 100 - (pb / 20 * 100)),
+        (_truthy(ps), 100 - (ps / 15 * 100)),
+        (_truthy(peg) & (peg > 0), 100 - (peg / 3 * 100)),
+        # 50 + |d| for a discount, 50 - d above the high: both are 50 - d
+        (~np.isnan(discount), 50 - discount),
+    ]
+    used = np.stack([m for m, _ in parts], axis=1)
+    scores = np.stack([np.where(m, np.clip(s, 0, 100), 0.0) for m, s in parts], axis=1)
+    count = used.sum(axis=1)
+    total = np.cumsum(scores, axis=1)[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where((pe > 0) & (count > 0), np.round(total / count), np.nan)
+
+
+# ─── Records ───
+def build_records(items, now=None, timings=None, observed=None, reports=None):
+    """Finish fetched items into output records (pePercentile, peHistory, ...).
+
+    ``observed`` maps ticker -> (month indices, P/E) recorded by the
+    snapshot store (snapshots.monthly). ``reports`` maps ticker -> reported
+    quarterly EPS, [[date, EPS], ...] ascending (earnings.load_reports). If ``timings`` is a dict it receives
+    seconds spent per step (pe_history, percentile, similar_cases,
+    value_score, records).
+    """
+    if not items:
+        return []
+    timings = {} if timings is None else timings
+    lap = time.perf_counter()
+
+    def mark(step):
+        nonlocal lap
+        t = time.perf_counter()
+        timings[step] = t - lap
+        lap = t
+
+    now = now or datetime.now()
+    now_month = now.year * 12 + now.month - 1
+
+    pe = _vector(items, "pe")
+    price = _vector(items, "price")
+    width = max(len(it["history"]["months"]) for it in items)
+    months = _pad([[month_index(m) for m in it["history"]["months"]] for it in items], -1, np.int64, width)
+    closes = _pad([it["history"].get("close") or [] for it in items], np.nan, float, width)
+    given = _pad([it["history"].get("pe") or [] for it in items], np.nan, float, width)
+    from_closes = np.array(["close" in it["history"] for it in items])
+    values = np.where(from_closes[:, None], estimate_pe(pe, price, closes), given)
+    eps = [_reports((reports or {}).get(it["record"]["ticker"])) for it in items]
+    if any(r is not None for r in eps):
+        real = real_pe(closes, trailing_eps(months, eps))
+        values = np.where(from_closes[:, None] & ~np.isnan(real), real, values)
+    if observed:
+        values = overlay_observed(values, months, [observed.get(it["record"]["ticker"]) for it in items],
+                                  now_month)
+    # Everything compared with the history uses the P/E as published, which is
+    # all a repriced record has, so both paths give the same points and ranks
+    shown = np.array([it["record"]["pe"] for it in items], dtype=float)
+    values = pin_current(values, months, shown, now_month)
+    values, months, lengths = compact(values, months)
+    values, months, lengths = append_anchor(values, months, lengths, shown, now_month)
+    mark("pe_history")
+
+    pct = percentiles(values, lengths, shown)
+    mark("percentile")
+    mask, returns, count, avg, win_rate = similar_cases(values, lengths, shown)
+    mark("similar_cases")
+    discount = np.array([it["record"]["discount52w"] for it in items], dtype=float)
+    scores = value_scores(pe, _vector(items, "forwardPE"), _vector(items, "pb"),
+                          _vector(items, "ps"), _vector(items, "peg"), discount)
+    mark("value_score")
+
+    labels = {m: month_label(m) for m in np.unique(months[months >= 0]).tolist()}
+    vals, mons, rets = values.tolist(), months.tolist(), returns.tolist()
+    case_rows, case_cols = np.nonzero(mask)
+    starts = np.searchsorted(case_rows, np.arange(len(items))).tolist()
+    case_cols = case_cols.tolist()
+    records = []
+    for i, item in enumerate(items):
+        record = dict(item["record"])
+        n = int(lengths[i])
+        history = [{"date": labels[mons[i][j]], "pe": vals[i][j]} for j in range(n)]
+        hist_perf = None
+        if count[i]:
+            idx = case_cols[starts[i]:starts[i] + min(int(count[i]), MAX_CASES)]
+            hist_perf = {
+                "similarCount": int(count[i]),
+                "avg6mReturn": float(avg[i]),
+                "winRate": int(win_rate[i]),
+                "cases": [{"date": history[j]["date"], "pe": vals[i][j], "return6m": rets[i][j]} for j in idx],
+            }
+        record["valueScore"] = None if np.isnan(scores[i]) else int(scores[i])
+        record["pePercentile"] = None if np.isnan(pct[i]) else int(pct[i])
+        record["peHistory"] = history
+        record["histPerformance"] = hist_perf
+        records.append(record)
+    mark("records")
+    return records
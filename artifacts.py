@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Dashboard data artifacts.
+
+Besides the full data/sp500_data.json, the dashboard gets a split layout:
+
+    data/sp500_index.json       the INDEX_FIELDS every tab renders from
+    data/details/<sector>.json  {ticker: {"peHistory", "cases", other fields}}
+    data/sp500_sorted.json      precomputed sort orders over the index rows
+
+The index is what the page needs for first paint; a sector's detail shard
+is fetched only when the P/E history chart or the history cards need it.
+Shards are written before the index, so the index never points at a shard
+that does not exist yet.
+
+With ``columnar=True`` the index's "stocks" is struct-of-arrays instead of
+a list of objects:
+
+    {"schema": {"version": 1, "length": n,
+                "fields": [{"name": "pe", "type": "num"}, ...]},
+     "columns": [[...], ...]}        # one array per field, schema order
+
+Nested objects are flattened to dotted fields ("histPerformance.winRate");
+an object whose fields are all null decodes back to null.
+
+Every dashboard file is then published under a content-hashed name
+(sp500_index.<hash>.json) with pre-compressed .gz and, when the brotli
+module is installed, .br siblings for servers that serve them statically.
+data/manifest.json maps the plain names to the hashed ones; it is written
+last and is the only file a browser has to revalidate, since a hashed URL
+never changes content. Hashed files referenced by neither the new nor the
+previous manifest are deleted.
+
+data/sp500_sorted.json holds the orderings the dashboard's sorts and top-N
+lookups walk instead of sorting, for the index with content hash "index":
+
+    {"version": 1, "index": hash,
+     "sectors": {sector: [start, end]},   # slice of each "sector" array below
+     "fields": {"pe": {"all": [row, ...],     # ascending, nulls last
+                       "sector": [row, ...]}, # the same, sector by sector
+                ...}}                          # one entry per SORT_FIELDS
+
+Rows are positions in the index's "stocks"; ties keep stock order, so a
+descending walk takes each run of equal values in forward order. A row's
+rank is its position in "all", and its sector rank its position within the
+sector's slice. It is a file of its own, published like the index, so the
+deltas below never carry it.
+
+Each run that changes the index also writes data/deltas/<from>.<to>.json,
+the per-field difference from the previous index keyed by ticker:
+
+    {"version": 1, "from": hash, "to": hash, "meta": {non-stock keys},
+     "changed": {ticker: {field: value}}, "added": {ticker: record},
+     "removed": [ticker], "order": [ticker]}   # order only if not implied
+
+The manifest lists the last DELTA_KEEP of them under "deltas", oldest
+first, so a browser holding an older index can walk the chain forward
+instead of downloading the whole file again.
+
+Run: python artifacts.py [--columnar]   (rebuild from data/sp500_data.json)
+"""
+import argparse, gzip, hashlib, json, os, re
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATA_DIR = "data"
+DATA_NAME = "sp500_data.json"
+INDEX_NAME = "sp500_index.json"
+SORTED_NAME = "sp500_sorted.json"
+DETAILS_NAME = "details"
+DELTAS_NAME = "deltas"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+HASH_LEN = 12
+HASHED = re.compile(r"\.[0-9a-f]{%d}\.json(\.gz|\.br)?$" % HASH_LEN)
+COMPACT = (",", ":")
+COLUMNAR_VERSION = 1
+SORTED_VERSION = 1
+DELTA_VERSION = 1
+DELTA_KEEP = 14
+
+# Pre-compressed variants: (manifest key, suffix, compress)
+ENCODINGS = [("gzip", ".gz", lambda data: gzip.compress(data, 9, mtime=0))]
+if brotli:
+    ENCODINGS.append(("br", ".br", lambda data: brotli.compress(data, quality=11)))
+
+# Per-stock fields the dashboard's lists, tables and heatmap read directly
+INDEX_FIELDS = ["ticker", "name", "sector", "pe", "forwardPE", "pb", "ps", "peg",
+                "discount52w", "valueScore", "pePercentile", "histPerformance"]
+# Index fields the dashboard sorts by; each gets a precomputed order
+SORT_FIELDS = ["pe", "forwardPE", "pb", "ps", "peg", "discount52w", "valueScore", "pePercentile"]
+
+
+def sector_slug(sector):
+    return re.sub(r"[^a-z0-9]+", "-", (sector or "unknown").lower()).strip("-")
+
+
+def split_stock(stock):
+    """(index record, detail record) for one stock.
+
+    histPerformance stays in the index without its cases; the cases, the
+    P/E history and every field outside INDEX_FIELDS go to the detail.
+    """
+    slim = {k: stock.get(k) for k in INDEX_FIELDS}
+    hist_perf = stock.get("histPerformance")
+    if hist_perf:
+        slim["histPerformance"] = {k: v for k, v in hist_perf.items() if k != "cases"}
+    detail = {k: v for k, v in stock.items() if k not in INDEX_FIELDS}
+    detail["peHistory"] = stock.get("peHistory") or []
+    detail["cases"] = (hist_perf or {}).get("cases") or []
+    return slim, detail
+
+
+def _column_type(values):
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "num"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    return "json"
+
+
+def to_columns(records):
+    """Struct-of-arrays block (schema + columns) for a list of dicts."""
+    keys = list(dict.fromkeys(k for r in records for k in r))
+    nested = {}
+    for r in records:
+        for k, v in r.items():
+            if isinstance(v, dict):
+                nested.setdefault(k, {}).update(dict.fromkeys(v))
+    fields, columns = [], []
+    for k in keys:
+        if k in nested:
+            for sub in nested[k]:
+                columns.append([(r.get(k) or {}).get(sub) for r in records])
+                fields.append(f"{k}.{sub}")
+        else:
+            columns.append([r.get(k) for r in records])
+            fields.append(k)
+    return {
+        "schema": {
+            "version": COLUMNAR_VERSION,
+            "length": len(records),
+            "fields": [{"name": f, "type": _column_type(c)} for f, c in zip(fields, columns)],
+        },
+        "columns": columns,
+    }
+
+
+def from_columns(block):
+    """Inverse of to_columns: back to a list of dicts."""
+    schema = block["schema"]
+    if schema["version"] != COLUMNAR_VERSION:
+        raise ValueError(f"unsupported columnar version {schema['version']}")
+    groups = {}
+    for field, column in zip(schema["fields"], block["columns"]):
+        key, _, sub = field["name"].partition(".")
+        groups.setdefault(key, []).append((sub, column))
+    records = [{} for _ in range(schema["length"])]
+    for key, parts in groups.items():
+        if not parts[0][0]:
+            for r, v in zip(records, parts[0][1]):
+                r[key] = v
+            continue
+        for i, r in enumerate(records):
+            obj = {sub: column[i] for sub, column in parts}
+            r[key] = obj if any(v is not None for v in obj.values()) else None
+    return records
+
+
+def sort_orders(stocks):
+    """The sp500_sorted.json orderings (see above) for the index rows ``stocks``."""
+    sector_of = [s.get("sector") or "" for s in stocks]
+    sizes = {}
+    for sector in sector_of:
+        sizes[sector] = sizes.get(sector, 0) + 1
+    sectors, start = {}, 0
+    for sector in sorted(sizes):
+        sectors[sector] = [start, start + sizes[sector]]
+        start += sizes[sector]
+    fields = {}
+    for field in SORT_FIELDS:
+        values = [s.get(field) for s in stocks]
+        order = sorted(range(len(stocks)), key=lambda i: (values[i] is None, values[i] or 0))
+        by_sector = {sector: [] for sector in sectors}
+        for i in order:
+            by_sector[sector_of[i]].append(i)
+        fields[field] = {"all": order, "sector": [i for rows in by_sector.values() for i in rows]}
+    return {"version": SORTED_VERSION, "sectors": sectors, "fields": fields}
+
+
+def _dump(obj, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        # dumps, not dump: json.dump always takes the pure-Python encoder
+        f.write(json.dumps(obj, ensure_ascii=False, separators=COMPACT))
+    os.replace(tmp, path)
+
+
+def write_split(output, out_dir=DATA_DIR, columnar=False, deltas=True):
+    """Write the slim index and per-sector detail shards for a full output dict.
+
+    ``output["stocks"]`` may be any iterable; it is read once and each
+    stock's detail is appended to its sector's shard straight away, so only
+    the slim index rows are held in memory. ``columnar`` stores the index's
+    stocks as struct-of-arrays (see above). ``deltas=False`` publishes the
+    files without diffing against the previous index, for data that is not
+    a continuation of it (generated samples).
+
+    Returns {sector: shard path relative to ``out_dir``}, which is also
+    stored in the index under "details".
+    """
+    details_dir = os.path.join(out_dir, DETAILS_NAME)
+    os.makedirs(details_dir, exist_ok=True)
+    previous_manifest, previous_index, previous_hash = None, None, None
+    if deltas:
+        previous_manifest = load_manifest(out_dir)
+        previous_index, previous_hash = read_index(out_dir)
+
+    slim_stocks, shards, details = [], {}, {}
+    try:
+        for stock in output["stocks"]:
+            slim, detail = split_stock(stock)
+            slim_stocks.append(slim)
+            sector = stock.get("sector")
+            f = shards.get(sector)
+            if f is None:
+                name = sector_slug(sector) + ".json"
+                details[sector or ""] = f"{DETAILS_NAME}/{name}"
+                f = shards[sector] = open(os.path.join(details_dir, name + ".tmp"), "w", encoding="utf-8")
+                f.write("{")
+            else:
+                f.write(",")
+            f.write(json.dumps(stock["ticker"], ensure_ascii=False) + ":"
+                    + json.dumps(detail, ensure_ascii=False, separators=COMPACT))
+        for f in shards.values():
+            f.write("}")
+    finally:
+        for f in shards.values():
+            f.close()
+    for path in details.values():
+        path = os.path.join(out_dir, path)
+        os.replace(path + ".tmp", path)
+    # Sectors that disappeared leave stale shards behind; drop them
+    written = {path.split("/")[-1] for path in details.values()}
+    for name in os.listdir(details_dir):
+        if name.endswith(".json") and name not in written and not HASHED.search(name):
+            os.remove(os.path.join(details_dir, name))
+
+    index = {k: v for k, v in output.items() if k != "stocks"}
+    index["stocks"] = to_columns(slim_stocks) if columnar else slim_stocks
+    index["details"] = details
+    index_path = os.path.join(out_dir, INDEX_NAME)
+    _dump(index, index_path)
+    index_hash = _digest(index_path)
+    _dump(dict(sort_orders(slim_stocks), index=index_hash), os.path.join(out_dir, SORTED_NAME))
+
+    chain = None
+    if previous_manifest and previous_index and previous_hash == previous_manifest["files"][INDEX_NAME]["hash"]:
+        chain = update_deltas(out_dir, previous_manifest, previous_index, previous_hash,
+                              dict(index, stocks=slim_stocks), index_hash)
+    publish(out_dir, [INDEX_NAME, SORTED_NAME, *details.values()], deltas=chain)
+    return details
+
+
+def read_index(out_dir=DATA_DIR):
+    """(index in row form, content hash) of the index on disk, or (None, None)."""
+    path = os.path.join(out_dir, INDEX_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if isinstance(index.get("stocks"), dict):
+        index["stocks"] = from_columns(index["stocks"])
+    return index, _digest(path)
+
+
+def diff_index(old, new):
+    """Per-field delta turning index ``old`` into ``new`` (both in row form)."""
+    old_rows = {s["ticker"]: s for s in old["stocks"]}
+    tickers = [s["ticker"] for s in new["stocks"]]
+    present = set(tickers)
+    changed, added = {}, {}
+    for s in new["stocks"]:
+        prev = old_rows.get(s["ticker"])
+        if prev is None:
+            added[s["ticker"]] = s
+            continue
+        fields = {k: v for k, v in s.items() if k not in prev or prev[k] != v}
+        if fields:
+            changed[s["ticker"]] = fields
+    delta = {
+        "meta": {k: v for k, v in new.items() if k != "stocks"},
+        "changed": changed,
+        "added": added,
+        "removed": [t for t in old_rows if t not in present],
+    }
+    if _implied_order(old, delta) != tickers:
+        delta["order"] = tickers
+    return delta
+
+
+def _implied_order(old, delta):
+    """Row order without an explicit "order": survivors in old order, then additions."""
+    removed = set(delta["removed"])
+    return [s["ticker"] for s in old["stocks"] if s["ticker"] not in removed] + list(delta["added"])
+
+
+def apply_delta(old, delta):
+    """Index ``old`` (row form) with ``delta`` applied; the same steps as index.html."""
+    rows = {s["ticker"]: dict(s) for s in old["stocks"]}
+    for t in delta["removed"]:
+        rows.pop(t, None)
+    for t, fields in delta["changed"].items():
+        rows[t].update(fields)
+    rows.update(delta["added"])
+    order = delta.get("order") or _implied_order(old, delta)
+    return dict(delta["meta"], stocks=[rows[t] for t in order])
+
+
+def update_deltas(out_dir, previous_manifest, previous_index, previous_hash, index, index_hash):
+    """Write the previous -> current delta and return the trimmed delta chain."""
+    chain = list(previous_manifest.get("deltas", []))
+    if index_hash != previous_hash:
+        delta = diff_index(previous_index, index)
+        # Only publish a delta that reproduces the new index exactly
+        if apply_delta(previous_index, delta) == index:
+            name = f"{DELTAS_NAME}/{previous_hash}.{index_hash}.json"
+            os.makedirs(os.path.join(out_dir, DELTAS_NAME), exist_ok=True)
+            _dump({"version": DELTA_VERSION, "from": previous_hash, "to": index_hash, **delta},
+                  os.path.join(out_dir, name))
+            chain.append({"from": previous_hash, "to": index_hash, "path": name,
+                          "bytes": os.path.getsize(os.path.join(out_dir, name))})
+    chain = chain[-DELTA_KEEP:]
+    keep = {d["path"].split("/")[-1] for d in chain}
+    deltas_dir = os.path.join(out_dir, DELTAS_NAME)
+    for fname in os.listdir(deltas_dir) if os.path.isdir(deltas_dir) else []:
+        if fname.endswith(".json") and fname not in keep:
+            os.remove(os.path.join(deltas_dir, fname))
+    return chain
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:HASH_LEN]
+
+
+def _hashed_name(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+
+def _write_once(path, data):
+    """Write bytes unless the (content-addressed) file already exists."""
+    if not os.path.exists(path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def load_manifest(out_dir=DATA_DIR):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def publish(out_dir, names, deltas=None):
+    """Hashed + pre-compressed copies of ``names`` (relative to out_dir) and the manifest.
+
+    ``deltas`` is the delta chain to list in the manifest. Returns the manifest.
+    """
+    previous = load_manifest(out_dir)
+    files = {}
+    for name in names:
+        with open(os.path.join(out_dir, name), "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+        hashed = _hashed_name(name, digest)
+        path = os.path.join(out_dir, hashed)
+        _write_once(path, data)
+        entry = {"path": hashed, "hash": digest, "bytes": len(data)}
+        for key, suffix, compress in ENCODINGS:
+            _write_once(path + suffix, compress(data))
+            entry[key] = os.path.getsize(path + suffix)
+        files[name] = entry
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "files": files,
+        "deltas": deltas or [],
+    }
+    # Keep the previous generation so pages holding the old manifest still load
+    keep = {e["path"] for m in (manifest, previous) if m for e in m["files"].values()}
+    for folder in {os.path.dirname(name) for name in names}:
+        for fname in os.listdir(os.path.join(out_dir, folder)):
+            rel = f"{folder}/{fname}" if folder else fname
+            if HASHED.search(fname) and re.sub(r"\.(gz|br)$", "", rel) not in keep:
+                os.remove(os.path.join(out_dir, folder, fname))
+    _dump(manifest, os.path.join(out_dir, MANIFEST_NAME))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild dashboard artifacts from the full data file.")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write the dashboard index as struct-of-arrays columns")
+    args = parser.parse_args(argv)
+
+    data_path = os.path.join(DATA_DIR, DATA_NAME)
+    index_path = os.path.join(DATA_DIR, INDEX_NAME)
+    with open(data_path, encoding="utf-8") as f:
+        output = json.load(f)
+    details = write_split(output, columnar=args.columnar)
+    full, index = os.path.getsize(data_path), os.path.getsize(index_path)
+    entry = load_manifest()["files"][INDEX_NAME]
+    print(f"✅ {index_path}: {index / 1024:.0f} KB ({full / index:.1f}x smaller than {data_path})")
+    print(f"   {entry['path']}: " + ", ".join(f"{k} {entry[k] / 1024:.0f} KB" for k, _, _ in ENCODINGS))
+    print(f"   {len(details)} detail shards in {os.path.join(DATA_DIR, DETAILS_NAME)}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cold-import benchmark for the screener's modules.
+
+Imports each module in a fresh interpreter several times and reports the
+median wall time, plus any of HEAVY it dragged in. Importing fetch_data or
+analytics must not load yfinance/pandas/requests (they are imported on the
+first fetch), so the run fails if one of them does.
+
+Run: python benchmarks/bench_import.py [--repeat 7] [--modules fetch_data analytics]
+     python benchmarks/bench_import.py --json head.json --compare base.json
+"""
+import argparse, json, os, statistics, subprocess, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+MODULES = ["analytics", "fetch_data", "artifacts", "store", "screen", "server", "generate_sample"]
+HEAVY = ["yfinance", "pandas", "requests"]
+LIGHT = ["analytics", "fetch_data"]   # modules that must import without HEAVY
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": ms, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, src, repeat):
+    """Median cold-import time of ``module`` and the heavy modules it loaded."""
+    code = PROBE.format(module=module, heavy=HEAVY)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=src, check=True,
+                             capture_output=True, text=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "ms": round(statistics.median(r["ms"] for r in runs), 1),
+        "minMs": round(min(r["ms"] for r in runs), 1),
+        "heavy": runs[-1]["heavy"],
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """Print time ratios against a baseline run; return False on a regression."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["module"]: r for r in json.load(f)}
+    ok = True
+    for r in results:
+        base = baseline.get(r["module"])
+        if not base:
+            continue
+        ratio = r["ms"] / base["ms"] if base["ms"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        ok &= flag == "ok"
+        print(f"  {r['module']:<16} {base['ms']:.0f}ms -> {r['ms']:.0f}ms ({ratio:.2f}x) {flag}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-import benchmark.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters per module")
+    parser.add_argument("--src", default=ROOT, help="tree whose modules are imported")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs baseline")
+    opts = parser.parse_args(argv)
+
+    # The first import compiles the .pyc files; time the cached case
+    subprocess.run([sys.executable, "-c", "import " + ", ".join(opts.modules)], cwd=opts.src,
+                   check=True, capture_output=True)
+    results = [measure(m, os.path.abspath(opts.src), opts.repeat) for m in opts.modules]
+
+    print(f"{'module':<16} {'median':>8} {'min':>8}  heavy imports")
+    print("-" * 50)
+    failed = False
+    for r in results:
+        bad = r["module"] in LIGHT and r["heavy"]
+        failed |= bool(bad)
+        print(f"{r['module']:<16} {r['ms']:>6.1f}ms {r['minMs']:>6.1f}ms  "
+              f"{', '.join(r['heavy']) or '-'}{'  ❌ should be lazy' if bad else ''}")
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if opts.compare:
+        print(f"\nvs {opts.compare} (tolerance {opts.tolerance:.0%}):")
+        failed |= not compare(results, opts.compare, opts.tolerance)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the fetch + analytics pipeline, fully offline.
+
+Runs fetch_data's stages (batched history, per-ticker fetch, analytics,
+aggregation, JSON write) against benchmarks/fake_yf.py for several universe
+sizes and reports wall time, requests/sec, per-stage timings and peak RSS.
+Each size runs in its own subprocess so peak memory is not shared.
+
+Run: python benchmarks/bench_pipeline.py [--sizes 500 5000 50000] [--latency 0.02]
+     python benchmarks/bench_pipeline.py --json head.json --compare base.json
+"""
+import argparse, json, os, resource, subprocess, sys, tempfile, time
+from contextlib import redirect_stdout
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+STAGES = ["history", "fetch", "analytics", "aggregate", "write"]
+
+
+def run_once(size, opts):
+    """Run the pipeline once in this process and return its measurements."""
+    sys.path[:0] = [opts.src, HERE]
+    import fake_yf
+    import fetch_data
+    import analytics
+    import earnings
+
+    fake_yf.configure(latency=opts.latency, error_rate=opts.error_rate, throttle_rps=opts.throttle_rps)
+    fetch_data.yf = fake_yf
+    universe = fake_yf.universe(size)
+    tickers = list(universe)
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = lap = time.perf_counter()
+
+        def mark(stage):
+            nonlocal lap
+            now = time.perf_counter()
+            stages[stage] = round(now - lap, 4)
+            lap = now
+
+        limiter = fetch_data.TokenBucket(opts.rate)
+        checkpoint = fetch_data.Checkpoint(os.path.join(tmp, "_state.json"))
+        closes = fetch_data.fetch_price_history(tickers, limiter, chunk_size=opts.history_chunk)
+        mark("history")
+        # Reported EPS goes to the temp dir too, so every run makes the same requests
+        earnings_dir = os.path.join(tmp, "earnings")
+        results = fetch_data.fetch_all(tickers, limiter, workers=opts.workers, closes=closes,
+                                       checkpoint=checkpoint, universe=universe, earnings_dir=earnings_dir)
+        checkpoint.flush(finished=True)
+        mark("fetch")
+        stocks = analytics.build_records([results[t] for t in tickers if results[t]],
+                                         reports=earnings.load_reports(tickers, earnings_dir))
+        mark("analytics")
+        sectors, summary = fetch_data.aggregate(stocks)
+        mark("aggregate")
+        fetch_data.write_output(stocks, sectors, summary, os.path.join(tmp, "sp500_data.json"))
+        mark("write")
+        wall = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    network = stages["history"] + stages["fetch"]
+    return {
+        "size": size,
+        "stocks": len(stocks),
+        "wall": round(wall, 3),
+        "requests": fake_yf.stats["requests"],
+        "requestsPerSec": round(fake_yf.stats["requests"] / network, 1) if network else None,
+        "throttled": fake_yf.stats["throttled"],
+        "errors": fake_yf.stats["errors"],
+        "stages": stages,
+        "peakMB": round(peak_mb, 1),
+    }
+
+
+def run_size(size, opts):
+    """Run one size in a fresh interpreter and parse its JSON result."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--one", str(size), "--src", opts.src,
+           "--workers", str(opts.workers), "--rate", str(opts.rate),
+           "--history-chunk", str(opts.history_chunk), "--latency", str(opts.latency),
+           "--error-rate", str(opts.error_rate)]
+    if opts.throttle_rps:
+        cmd += ["--throttle-rps", str(opts.throttle_rps)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def print_table(results):
+    head = f"{'size':>7} {'wall s':>8} {'req':>8} {'req/s':>9} {'peak MB':>8}  " + " ".join(f"{s:>9}" for s in STAGES)
+    print(head)
+    print("-" * len(head))
+    for r in results:
+        print(f"{r['size']:>7} {r['wall']:>8.2f} {r['requests']:>8} {r['requestsPerSec'] or 0:>9.0f} "
+              f"{r['peakMB']:>8.1f}  " + " ".join(f"{r['stages'][s]:>9.3f}" for s in STAGES))
+
+
+def compare(results, baseline_path, tolerance):
+    """Print wall-time ratios against a baseline run; return False on a regression."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["size"]: r for r in json.load(f)}
+    ok = True
+    for r in results:
+        base = baseline.get(r["size"])
+        if not base:
+            continue
+        ratio = r["wall"] / base["wall"] if base["wall"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        ok &= flag == "ok"
+        print(f"  {r['size']:>7}: {base['wall']:.2f}s -> {r['wall']:.2f}s ({ratio:.2f}x) {flag}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline fetch pipeline benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--src", default=ROOT, help="tree whose fetch_data.py is benchmarked")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=1e9, help="token bucket ceiling (req/s)")
+    parser.add_argument("--history-chunk", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake info failure probability")
+    parser.add_argument("--throttle-rps", type=float, default=None, help="fake 429 above this rate")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare wall times against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs baseline")
+    parser.add_argument("--one", type=int, help=argparse.SUPPRESS)
+    opts = parser.parse_args(argv)
+    opts.src = os.path.abspath(opts.src)
+
+    if opts.one:
+        print(json.dumps(run_once(opts.one, opts)))
+        return
+
+    results = []
+    for size in opts.sizes:
+        print(f"⏱️  {size} tickers...", flush=True)
+        results.append(run_size(size, opts))
+    print()
+    print_table(results)
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if opts.compare:
+        print(f"\nvs {opts.compare} (tolerance {opts.tolerance:.0%}):")
+        if not compare(results, opts.compare, opts.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the parts of yfinance the fetcher uses.
+
+Serves deterministic synthetic Ticker.info dicts, quarterly/daily price
+frames and earnings-date tables for any ticker, with configurable per-request latency, a random
+error rate and a requests-per-second ceiling above which it raises
+YFRateLimitError like Yahoo's 429s. Install it with
+``fetch_data.yf = fake_yf`` before running the pipeline.
+"""
+import random, threading, time, zlib
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+SECTORS = [
+    "Information Technology", "Financials", "Health Care", "Consumer Discretionary",
+    "Industrials", "Communication Services", "Consumer Staples", "Energy",
+    "Utilities", "Real Estate", "Materials",
+]
+
+CONFIG = {
+    "latency": 0.0,        # seconds slept per request
+    "error_rate": 0.0,     # probability a Ticker.info request fails outright
+    "throttle_rps": None,  # requests/second above which YFRateLimitError is raised
+    "quarters": 21,        # quarterly bars in a 5y/3mo history
+}
+
+_lock = threading.Lock()
+_recent = deque()
+_rng = random.Random(0)
+stats = {"requests": 0, "info": 0, "history": 0, "earnings": 0, "download": 0, "errors": 0, "throttled": 0}
+
+
+class YFRateLimitError(Exception):
+    def __init__(self):
+        super().__init__("Too Many Requests. Rate limited. Try after a while.")
+
+
+def configure(**options):
+    """Update CONFIG and reset the request counters."""
+    unknown = set(options) - set(CONFIG)
+    if unknown:
+        raise TypeError(f"unknown fake_yf options: {sorted(unknown)}")
+    CONFIG.update(options)
+    with _lock:
+        _recent.clear()
+        for k in stats:
+            stats[k] = 0
+
+
+def universe(size):
+    """Synthetic {ticker: (name, sector)} of the requested size."""
+    return {f"SYN{i:05d}": (f"Synthetic {i}", SECTORS[i % len(SECTORS)]) for i in range(size)}
+
+
+def _request(kind, fallible=False):
+    with _lock:
+        stats["requests"] += 1
+        stats[kind] += 1
+        now = time.monotonic()
+        limit = CONFIG["throttle_rps"]
+        if limit:
+            _recent.append(now)
+            while _recent and now - _recent[0] > 1.0:
+                _recent.popleft()
+            if len(_recent) > limit:
+                stats["throttled"] += 1
+                raise YFRateLimitError()
+        failed = fallible and _rng.random() < CONFIG["error_rate"]
+        if failed:
+            stats["errors"] += 1
+    if CONFIG["latency"]:
+        time.sleep(CONFIG["latency"])
+    if failed:
+        raise RuntimeError("HTTP Error 404: synthetic failure")
+
+
+def _seed(ticker):
+    return zlib.crc32(ticker.encode())
+
+
+def _info(ticker):
+    r = random.Random(_seed(ticker))
+    price = round(r.uniform(5, 800), 2)
+    eps = price / r.uniform(6, 90) * r.choice([1, 1, 1, 1, 1, 1, 1, 1, 1, -1])
+    forward_pe = r.uniform(5, 60)
+    info = {
+        "shortName": ticker,
+        "currentPrice": price,
+        "trailingPE": price / eps if eps > 0 else None,
+        "forwardPE": forward_pe,
+        "priceToBook": r.uniform(0.5, 40),
+        "priceToSalesTrailing12Months": r.uniform(0.2, 20),
+        "pegRatio": r.choice([None, r.uniform(0.2, 4)]),
+        "enterpriseToEbitda": r.uniform(3, 45),
+        "dividendYield": r.choice([None, r.uniform(0.001, 0.06)]),
+        "returnOnEquity": r.uniform(-0.3, 0.6),
+        "marketCap": int(r.uniform(1e9, 3e12)),
+        "fiftyTwoWeekHigh": round(price * r.uniform(1.0, 1.7), 2),
+        "fiftyTwoWeekLow": round(price * r.uniform(0.5, 1.0), 2),
+        "trailingEps": eps,
+        "forwardEps": price / forward_pe,
+        "earningsTimestamp": int(time.time()) + r.randint(-60, 60) * 86400,
+    }
+    info["sharesOutstanding"] = round(info["marketCap"] / price)
+    return info
+
+
+def _closes(ticker, periods):
+    r = np.random.default_rng(_seed(ticker))
+    price = _info(ticker)["currentPrice"]
+    walk = np.exp(np.cumsum(r.normal(0, 0.12, periods)))
+    return price * walk / walk[-1]
+
+
+def _index(period, interval):
+    if interval == "1d":
+        return pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 if period == "1y" else 5)
+    return pd.date_range(end=pd.Timestamp.today().normalize(), periods=CONFIG["quarters"], freq="3MS")
+
+
+def _earnings(ticker, limit):
+    """Earnings-date table: the next (unreported) date, then ``limit`` - 1 reported quarters."""
+    info = _info(ticker)
+    r = np.random.default_rng(_seed(ticker) + 1)
+    # Quarterly EPS growing into today's trailing EPS, newest first
+    quarterly = info["trailingEps"] / 4 * np.exp(-np.r_[0, np.cumsum(r.normal(0.015, 0.08, limit - 2))])
+    dates = pd.to_datetime(info["earningsTimestamp"], unit="s", utc=True) - pd.to_timedelta(
+        np.arange(limit) * 91, unit="D")
+    return pd.DataFrame({"EPS Estimate": np.r_[quarterly[0], quarterly],
+                         "Reported EPS": np.r_[np.nan, np.round(quarterly, 2)]},
+                        index=pd.DatetimeIndex(dates.tz_convert("America/New_York"), name="Earnings Date"))
+
+
+class Ticker:
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        _request("info", fallible=True)
+        return _info(self.ticker)
+
+    def history(self, period="1mo", interval="1d", **kwargs):
+        _request("history")
+        index = _index(period, interval)
+        return pd.DataFrame({"Close": _closes(self.ticker, len(index))}, index=index)
+
+    def get_earnings_dates(self, limit=12, offset=0):
+        _request("earnings")
+        return _earnings(self.ticker, limit)
+
+
+def download(tickers, period="1mo", interval="1d", group_by="column", **kwargs):
+    """Multi-ticker download: one request, (ticker, field) columns like group_by="ticker"."""
+    if isinstance(tickers, str):
+        tickers = tickers.split()
+    _request("download")
+    index = _index(period, interval)
+    bars = [_closes(t, len(index)) * f for t in tickers for f in (1.01, 0.99, 1.0)]
+    data = np.column_stack(bars) if bars else np.empty((len(index), 0))
+    columns = pd.MultiIndex.from_product([tickers, ["High", "Low", "Close"]])
+    return pd.DataFrame(data, index=index, columns=columns)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Permanent store of reported quarterly EPS.
+
+Each ticker's reported earnings live in data/earnings/<TICKER>.json:
+
+    {"ticker": "AAPL",
+     "reports": [["2021-01-27", 1.68], ...],   # report date, EPS; ascending
+     "nextEarnings": "2026-10-30",             # or null if none announced
+     "checkedAt": "2026-10-17"}
+
+A reported quarter never changes, so the first fetch backfills
+BACKFILL_QUARTERS in one request and later runs only ask Yahoo again once
+nextEarnings has passed (or, with no date announced, after RECHECK_DAYS),
+for the newest REFRESH_QUARTERS. Reports already stored are kept as they
+are. The pipeline reads them back with load_reports for analytics, which
+joins them onto the quarterly closes; they are not copied into the
+checkpoint.
+
+Run: python earnings.py AAPL [MSFT ...]   (show what is stored)
+"""
+import json, math, os, sys, threading
+from datetime import date, datetime, timedelta
+
+EARNINGS_DIR = "data/earnings"
+BACKFILL_QUARTERS = 28   # 5y of quarterly bars plus the four quarters before the first, with slack
+REFRESH_QUARTERS = 4
+RECHECK_DAYS = 30
+
+_lock = threading.Lock()
+
+
+def _path(ticker, root):
+    return os.path.join(root, f"{ticker}.json")
+
+
+def load(ticker, root=EARNINGS_DIR):
+    """The stored entry for ``ticker``, or None."""
+    try:
+        with open(_path(ticker, root), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_reports(tickers, root=EARNINGS_DIR):
+    """{ticker: [[date, EPS], ...]} for the ``tickers`` with stored reports."""
+    entries = (load(t, root) for t in tickers)
+    return {e["ticker"]: e["reports"] for e in entries if e and e["reports"]}
+
+
+def due(entry, today=None):
+    """True if ``entry`` (None = nothing stored) may be missing a reported quarter."""
+    today = (today or date.today()).isoformat()
+    if entry is None:
+        return True
+    if entry["nextEarnings"]:
+        return entry["nextEarnings"] <= today
+    checked = date.fromisoformat(entry["checkedAt"])
+    return (checked + timedelta(days=RECHECK_DAYS)).isoformat() <= today
+
+
+def quarters(entry):
+    """How many quarters to request for ``entry``: a backfill or a refresh."""
+    return BACKFILL_QUARTERS if entry is None else REFRESH_QUARTERS
+
+
+def parse(frame):
+    """[[date, EPS], ...] ascending from a Ticker.get_earnings_dates frame.
+
+    Rows without a reported EPS (upcoming dates, calls, meetings) are skipped.
+    """
+    if frame is None or frame.empty or "Reported EPS" not in frame.columns:
+        return []
+    if "Event Type" in frame.columns:
+        frame = frame[frame["Event Type"] == "Earnings"]
+    reports = {}
+    for when, eps in zip(frame.index, frame["Reported EPS"].tolist()):
+        if isinstance(eps, (int, float)) and math.isfinite(eps):
+            reports[when.date().isoformat()] = float(eps)
+    return sorted(reports.items())
+
+
+def merge(entry, ticker, reports, next_earnings=None, today=None):
+    """A new entry with ``reports`` added; stored report dates are never overwritten.
+
+    ``next_earnings`` is epoch seconds (fetch_data.next_earnings) or None.
+    """
+    stored = dict(map(tuple, entry["reports"])) if entry else {}
+    for day, eps in reports:
+        stored.setdefault(day, eps)
+    return {
+        "ticker": ticker,
+        "reports": [list(r) for r in sorted(stored.items())],
+        "nextEarnings": datetime.fromtimestamp(next_earnings).date().isoformat() if next_earnings else None,
+        "checkedAt": (today or date.today()).isoformat(),
+    }
+
+
+def save(entry, root=EARNINGS_DIR):
+    path = _path(entry["ticker"], root)
+    with _lock:
+        os.makedirs(root, exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    tickers = sys.argv[1:] if argv is None else argv
+    if not tickers:
+        sys.exit("usage: python earnings.py TICKER [TICKER ...]")
+    for ticker in tickers:
+        entry = load(ticker)
+        if entry is None:
+            print(f"{ticker}: nothing stored in {EARNINGS_DIR}/")
+            continue
+        print(f"{ticker}: {len(entry['reports'])} quarters, next {entry['nextEarnings'] or '?'}, "
+              f"checked {entry['checkedAt']}")
+        for day, eps in entry["reports"]:
+            print(f"  {day}  {eps:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
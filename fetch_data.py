@@ -1,527 +1,180 @@
 #!/usr/bin/env python3
 """
 S&P 500 Value Screener - Data Fetcher (yfinance version)
-No API key needed. Uses yfinance + hardcoded S&P 500 list.
+No API key needed. Uses yfinance + the constituents in universes/ (registry.py).
 """
-import json, os, time, sys
+import argparse, json, os, tempfile, time, sys, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 
-try:
-    import yfinance as yf
-except ImportError:
-    print("Installing yfinance...")
-    os.system(f"{sys.executable} -m pip install yfinance --break-system-packages -q")
-    import yfinance as yf
-
-# ─── S&P 500 Constituents (hardcoded) ───
-SP500 = {
-    "MMM": ("3M", "Industrials"),
-    "AOS": ("A. O. 스미스", "Industrials"),
-    "ABT": ("애벗 래버러토리스", "Health Care"),
-    "ABBV": ("애브비", "Health Care"),
-    "ACN": ("액센츄어", "Information Technology"),
-    "ADBE": ("어도비", "Information Technology"),
-    "AMD": ("AMD", "Information Technology"),
-    "AES": ("AES Corporation", "Utilities"),
-    "AFL": ("아플락", "Financials"),
-    "A": ("애질런트 테크놀로지스", "Health Care"),
-    "APD": ("에어프로덕츠", "Materials"),
-    "ABNB": ("에어비앤비", "Consumer Discretionary"),
-    "AKAM": ("아카마이 테크놀로지스", "Information Technology"),
-    "ALB": ("알버말", "Materials"),
-    "ARE": ("Alexandria Real Estate Equities", "Real Estate"),
-    "ALGN": ("Align Technology", "Health Care"),
-    "ALLE": ("Allegion", "Industrials"),
-    "LNT": ("Alliant Energy", "Utilities"),
-    "ALL": ("올스테이트", "Financials"),
-    "GOOGL": ("알파벳 (A)", "Communication Services"),
-    "GOOG": ("알파벳 (C)", "Communication Services"),
-    "MO": ("알트리아", "Consumer Staples"),
-    "AMZN": ("아마존", "Consumer Discretionary"),
-    "AMCR": ("Amcor", "Materials"),
-    "AEE": ("Ameren", "Utilities"),
-    "AEP": ("아메리칸 일렉트릭 파워", "Utilities"),
-    "AXP": ("아메리칸 익스프레스", "Financials"),
-    "AIG": ("AIG", "Financials"),
-    "AMT": ("American Tower", "Real Estate"),
-    "AWK": ("American Water Works", "Utilities"),
-    "AMP": ("Ameriprise Financial", "Financials"),
-    "AME": ("Ametek", "Industrials"),
-    "AMGN": ("Amgen", "Health Care"),
-    "APH": ("Amphenol", "Information Technology"),
-    "ADI": ("Analog Devices", "Information Technology"),
-    "ANSS": ("Ansys", "Information Technology"),
-    "AON": ("Aon", "Financials"),
-    "APA": ("APA Corporation", "Energy"),
-    "APO": ("Apollo Global Management", "Financials"),
-    "AAPL": ("Apple", "Information Technology"),
-    "AMAT": ("Applied Materials", "Information Technology"),
-    "APTV": ("Aptiv", "Consumer Discretionary"),
-    "ACGL": ("Arch Capital Group", "Financials"),
-    "ADM": ("아처 대니얼스 미들랜드", "Consumer Staples"),
-    "ANET": ("Arista Networks", "Information Technology"),
-    "AJG": ("Arthur J. Gallagher", "Financials"),
-    "AIZ": ("Assurant", "Financials"),
-    "T": ("AT&T", "Communication Services"),
-    "ATO": ("Atmos Energy", "Utilities"),
-    "ADSK": ("Autodesk", "Information Technology"),
-    "ADP": ("Automatic Data Processing", "Industrials"),
-    "AZO": ("AutoZone", "Consumer Discretionary"),
-    "AVB": ("AvalonBay Communities", "Real Estate"),
-    "AVY": ("Avery Dennison", "Materials"),
-    "AXON": ("Axon Enterprise", "Industrials"),
-    "BKR": ("Baker Hughes", "Energy"),
-    "BALL": ("Ball Corporation", "Materials"),
-    "BAC": ("Bank of America", "Financials"),
-    "BAX": ("Baxter International", "Health Care"),
-    "BDX": ("Becton Dickinson", "Health Care"),
-    "BRK-B": ("Berkshire Hathaway", "Financials"),
-    "BBY": ("Best Buy", "Consumer Discretionary"),
-    "TECH": ("Bio-Techne", "Health Care"),
-    "BIIB": ("Biogen", "Health Care"),
-    "BLK": ("BlackRock", "Financials"),
-    "BX": ("Blackstone", "Financials"),
-    "BK": ("뉴욕멜론은행", "Financials"),
-    "BA": ("보잉", "Industrials"),
-    "BKNG": ("Booking Holdings", "Consumer Discretionary"),
-    "BSX": ("Boston Scientific", "Health Care"),
-    "BMY": ("브리스톨 마이어스 스퀴브", "Health Care"),
-    "AVGO": ("Broadcom", "Information Technology"),
-    "BR": ("Broadridge Financial", "Industrials"),
-    "BRO": ("Brown & Brown", "Financials"),
-    "BF-B": ("Brown-Forman", "Consumer Staples"),
-    "BLDR": ("Builders FirstSource", "Industrials"),
-    "BG": ("Bunge Global", "Consumer Staples"),
-    "BXP": ("BXP Inc", "Real Estate"),
-    "CHRW": ("C.H. Robinson", "Industrials"),
-    "CDNS": ("Cadence Design Systems", "Information Technology"),
-    "CZR": ("Caesars Entertainment", "Consumer Discretionary"),
-    "CPT": ("Camden Property Trust", "Real Estate"),
-    "CPB": ("캠벨 수프", "Consumer Staples"),
-    "COF": ("Capital One", "Financials"),
-    "CAH": ("Cardinal Health", "Health Care"),
-    "KMX": ("CarMax", "Consumer Discretionary"),
-    "CCL": ("Carnival", "Consumer Discretionary"),
-    "CARR": ("Carrier Global", "Industrials"),
-    "CAT": ("캐터필러", "Industrials"),
-    "CBOE": ("Cboe Global Markets", "Financials"),
-    "CBRE": ("CBRE Group", "Real Estate"),
-    "CDW": ("CDW Corporation", "Information Technology"),
-    "COR": ("Cencora", "Health Care"),
-    "CNC": ("Centene", "Health Care"),
-    "CNP": ("CenterPoint Energy", "Utilities"),
-    "CF": ("CF Industries", "Materials"),
-    "CRL": ("Charles River Labs", "Health Care"),
-    "SCHW": ("Charles Schwab", "Financials"),
-    "CHTR": ("Charter Communications", "Communication Services"),
-    "CVX": ("셰브론", "Energy"),
-    "CMG": ("Chipotle", "Consumer Discretionary"),
-    "CB": ("Chubb", "Financials"),
-    "CHD": ("Church & Dwight", "Consumer Staples"),
-    "CI": ("Cigna", "Health Care"),
-    "CINF": ("Cincinnati Financial", "Financials"),
-    "CTAS": ("Cintas", "Industrials"),
-    "CSCO": ("Cisco", "Information Technology"),
-    "C": ("Citigroup", "Financials"),
-    "CFG": ("Citizens Financial", "Financials"),
-    "CLX": ("Clorox", "Consumer Staples"),
-    "CME": ("CME Group", "Financials"),
-    "CMS": ("CMS Energy", "Utilities"),
-    "KO": ("코카콜라", "Consumer Staples"),
-    "CTSH": ("Cognizant", "Information Technology"),
-    "CL": ("콜게이트-파몰리브", "Consumer Staples"),
-    "CMCSA": ("Comcast", "Communication Services"),
-    "CAG": ("Conagra Brands", "Consumer Staples"),
-    "COP": ("ConocoPhillips", "Energy"),
-    "ED": ("Consolidated Edison", "Utilities"),
-    "STZ": ("Constellation Brands", "Consumer Staples"),
-    "CEG": ("Constellation Energy", "Utilities"),
-    "COO": ("Cooper Companies", "Health Care"),
-    "CPRT": ("Copart", "Industrials"),
-    "GLW": ("Corning", "Information Technology"),
-    "CPAY": ("Corpay", "Financials"),
-    "CTVA": ("Corteva", "Materials"),
-    "CSGP": ("CoStar Group", "Real Estate"),
-    "COST": ("Costco", "Consumer Staples"),
-    "CTRA": ("Coterra", "Energy"),
-    "CRWD": ("CrowdStrike", "Information Technology"),
-    "CCI": ("Crown Castle", "Real Estate"),
-    "CSX": ("CSX Corporation", "Industrials"),
-    "CMI": ("Cummins", "Industrials"),
-    "CVS": ("CVS Health", "Health Care"),
-    "DHR": ("Danaher", "Health Care"),
-    "DRI": ("Darden Restaurants", "Consumer Discretionary"),
-    "DVA": ("DaVita", "Health Care"),
-    "DAY": ("Dayforce", "Industrials"),
-    "DECK": ("Deckers Brands", "Consumer Discretionary"),
-    "DE": ("Deere & Company", "Industrials"),
-    "DELL": ("Dell Technologies", "Information Technology"),
-    "DAL": ("Delta Air Lines", "Industrials"),
-    "DVN": ("Devon Energy", "Energy"),
-    "DXCM": ("Dexcom", "Health Care"),
-    "FANG": ("Diamondback Energy", "Energy"),
-    "DLR": ("Digital Realty", "Real Estate"),
-    "DFS": ("Discover Financial", "Financials"),
-    "DG": ("Dollar General", "Consumer Staples"),
-    "DLTR": ("Dollar Tree", "Consumer Staples"),
-    "D": ("Dominion Energy", "Utilities"),
-    "DPZ": ("Domino\'s", "Consumer Discretionary"),
-    "DASH": ("DoorDash", "Consumer Discretionary"),
-    "DOV": ("Dover Corporation", "Industrials"),
-    "DOW": ("Dow Inc", "Materials"),
-    "DHI": ("D.R. Horton", "Consumer Discretionary"),
-    "DTE": ("DTE Energy", "Utilities"),
-    "DUK": ("Duke Energy", "Utilities"),
-    "DD": ("DuPont", "Materials"),
-    "EMN": ("Eastman Chemical", "Materials"),
-    "ETN": ("Eaton Corporation", "Industrials"),
-    "EBAY": ("eBay", "Consumer Discretionary"),
-    "ECL": ("Ecolab", "Materials"),
-    "EIX": ("Edison International", "Utilities"),
-    "EW": ("Edwards Lifesciences", "Health Care"),
-    "EA": ("Electronic Arts", "Communication Services"),
-    "ELV": ("Elevance Health", "Health Care"),
-    "EMR": ("Emerson Electric", "Industrials"),
-    "ENPH": ("Enphase Energy", "Information Technology"),
-    "ETR": ("Entergy", "Utilities"),
-    "EOG": ("EOG Resources", "Energy"),
-    "EPAM": ("EPAM Systems", "Information Technology"),
-    "EQT": ("EQT Corporation", "Energy"),
-    "EFX": ("Equifax", "Industrials"),
-    "EQIX": ("Equinix", "Real Estate"),
-    "EQR": ("Equity Residential", "Real Estate"),
-    "ERIE": ("Erie Indemnity", "Financials"),
-    "ESS": ("Essex Property Trust", "Real Estate"),
-    "EL": ("에스티 로더", "Consumer Staples"),
-    "EG": ("Everest Group", "Financials"),
-    "EVRG": ("Evergy", "Utilities"),
-    "ES": ("Eversource Energy", "Utilities"),
-    "EXC": ("Exelon", "Utilities"),
-    "EXE": ("Expand Energy", "Energy"),
-    "EXPE": ("Expedia", "Consumer Discretionary"),
-    "EXPD": ("Expeditors International", "Industrials"),
-    "EXR": ("Extra Space Storage", "Real Estate"),
-    "XOM": ("ExxonMobil", "Energy"),
-    "FFIV": ("F5 Inc", "Information Technology"),
-    "FDS": ("FactSet", "Financials"),
-    "FICO": ("Fair Isaac", "Information Technology"),
-    "FAST": ("Fastenal", "Industrials"),
-    "FRT": ("Federal Realty", "Real Estate"),
-    "FDX": ("FedEx", "Industrials"),
-    "FIS": ("FIS", "Financials"),
-    "FITB": ("Fifth Third Bancorp", "Financials"),
-    "FSLR": ("First Solar", "Information Technology"),
-    "FE": ("FirstEnergy", "Utilities"),
-    "FI": ("Fiserv", "Financials"),
-    "F": ("Ford", "Consumer Discretionary"),
-    "FTNT": ("Fortinet", "Information Technology"),
-    "FTV": ("Fortive", "Industrials"),
-    "FOXA": ("Fox Corp (A)", "Communication Services"),
-    "FOX": ("Fox Corp (B)", "Communication Services"),
-    "BEN": ("Franklin Resources", "Financials"),
-    "FCX": ("Freeport-McMoRan", "Materials"),
-    "GRMN": ("Garmin", "Consumer Discretionary"),
-    "IT": ("Gartner", "Information Technology"),
-    "GE": ("GE Aerospace", "Industrials"),
-    "GEHC": ("GE HealthCare", "Health Care"),
-    "GEV": ("GE Vernova", "Industrials"),
-    "GEN": ("Gen Digital", "Information Technology"),
-    "GNRC": ("Generac", "Industrials"),
-    "GD": ("General Dynamics", "Industrials"),
-    "GIS": ("General Mills", "Consumer Staples"),
-    "GM": ("General Motors", "Consumer Discretionary"),
-    "GPC": ("Genuine Parts", "Consumer Discretionary"),
-    "GILD": ("Gilead Sciences", "Health Care"),
-    "GPN": ("Global Payments", "Financials"),
-    "GL": ("Globe Life", "Financials"),
-    "GDDY": ("GoDaddy", "Information Technology"),
-    "GS": ("골드만삭스", "Financials"),
-    "HAL": ("Halliburton", "Energy"),
-    "HIG": ("하트퍼드", "Financials"),
-    "HAS": ("Hasbro", "Consumer Discretionary"),
-    "HCA": ("HCA Healthcare", "Health Care"),
-    "DOC": ("Healthpeak Properties", "Real Estate"),
-    "HSIC": ("Henry Schein", "Health Care"),
-    "HSY": ("Hershey", "Consumer Staples"),
-    "HES": ("Hess Corporation", "Energy"),
-    "HPE": ("HP Enterprise", "Information Technology"),
-    "HLT": ("Hilton Worldwide", "Consumer Discretionary"),
-    "HOLX": ("Hologic", "Health Care"),
-    "HD": ("Home Depot", "Consumer Discretionary"),
-    "HON": ("Honeywell", "Industrials"),
-    "HRL": ("Hormel Foods", "Consumer Staples"),
-    "HST": ("Host Hotels & Resorts", "Real Estate"),
-    "HWM": ("Howmet Aerospace", "Industrials"),
-    "HPQ": ("HP Inc", "Information Technology"),
-    "HUBB": ("Hubbell", "Industrials"),
-    "HUM": ("Humana", "Health Care"),
-    "HBAN": ("Huntington Bancshares", "Financials"),
-    "HII": ("Huntington Ingalls", "Industrials"),
-    "IBM": ("IBM", "Information Technology"),
-    "IEX": ("IDEX Corporation", "Industrials"),
-    "IDXX": ("Idexx Laboratories", "Health Care"),
-    "ITW": ("Illinois Tool Works", "Industrials"),
-    "INCY": ("Incyte", "Health Care"),
-    "IR": ("Ingersoll Rand", "Industrials"),
-    "PODD": ("Insulet", "Health Care"),
-    "INTC": ("Intel", "Information Technology"),
-    "ICE": ("Intercontinental Exchange", "Financials"),
-    "IFF": ("IFF", "Materials"),
-    "IP": ("International Paper", "Materials"),
-    "IPG": ("Interpublic Group", "Communication Services"),
-    "INTU": ("Intuit", "Information Technology"),
-    "ISRG": ("Intuitive Surgical", "Health Care"),
-    "IVZ": ("Invesco", "Financials"),
-    "INVH": ("Invitation Homes", "Real Estate"),
-    "IQV": ("IQVIA", "Health Care"),
-    "IRM": ("Iron Mountain", "Real Estate"),
-    "JBHT": ("J.B. Hunt", "Industrials"),
-    "JBL": ("Jabil", "Information Technology"),
-    "JKHY": ("Jack Henry", "Financials"),
-    "J": ("Jacobs Solutions", "Industrials"),
-    "JNJ": ("Johnson & Johnson", "Health Care"),
-    "JCI": ("Johnson Controls", "Industrials"),
-    "JPM": ("JPMorgan Chase", "Financials"),
-    "JNPR": ("Juniper Networks", "Information Technology"),
-    "K": ("Kellanova", "Consumer Staples"),
-    "KVUE": ("Kenvue", "Consumer Staples"),
-    "KDP": ("Keurig Dr Pepper", "Consumer Staples"),
-    "KEY": ("KeyCorp", "Financials"),
-    "KEYS": ("Keysight Technologies", "Information Technology"),
-    "KMB": ("Kimberly-Clark", "Consumer Staples"),
-    "KIM": ("Kimco Realty", "Real Estate"),
-    "KMI": ("Kinder Morgan", "Energy"),
-    "KKR": ("KKR & Co", "Financials"),
-    "KLAC": ("KLA Corporation", "Information Technology"),
-    "KHC": ("Kraft Heinz", "Consumer Staples"),
-    "KR": ("Kroger", "Consumer Staples"),
-    "LHX": ("L3Harris", "Industrials"),
-    "LH": ("Labcorp", "Health Care"),
-    "LRCX": ("Lam Research", "Information Technology"),
-    "LW": ("Lamb Weston", "Consumer Staples"),
-    "LVS": ("Las Vegas Sands", "Consumer Discretionary"),
-    "LDOS": ("Leidos", "Industrials"),
-    "LEN": ("Lennar", "Consumer Discretionary"),
-    "LII": ("Lennox International", "Industrials"),
-    "LLY": ("Eli Lilly", "Health Care"),
-    "LIN": ("Linde", "Materials"),
-    "LYV": ("Live Nation", "Communication Services"),
-    "LKQ": ("LKQ Corporation", "Consumer Discretionary"),
-    "LMT": ("Lockheed Martin", "Industrials"),
-    "L": ("Loews Corporation", "Financials"),
-    "LOW": ("Lowe\'s", "Consumer Discretionary"),
-    "LULU": ("Lululemon", "Consumer Discretionary"),
-    "LYB": ("LyondellBasell", "Materials"),
-    "MTB": ("M&T Bank", "Financials"),
-    "MPC": ("Marathon Petroleum", "Energy"),
-    "MKTX": ("MarketAxess", "Financials"),
-    "MAR": ("Marriott", "Consumer Discretionary"),
-    "MMC": ("Marsh McLennan", "Financials"),
-    "MLM": ("Martin Marietta", "Materials"),
-    "MAS": ("Masco", "Industrials"),
-    "MA": ("Mastercard", "Financials"),
-    "MTCH": ("Match Group", "Communication Services"),
-    "MKC": ("McCormick", "Consumer Staples"),
-    "MCD": ("McDonald\'s", "Consumer Discretionary"),
-    "MCK": ("McKesson", "Health Care"),
-    "MDT": ("Medtronic", "Health Care"),
-    "MRK": ("Merck", "Health Care"),
-    "META": ("Meta Platforms", "Communication Services"),
-    "MET": ("MetLife", "Financials"),
-    "MTD": ("Mettler Toledo", "Health Care"),
-    "MGM": ("MGM Resorts", "Consumer Discretionary"),
-    "MCHP": ("Microchip Technology", "Information Technology"),
-    "MU": ("Micron Technology", "Information Technology"),
-    "MSFT": ("Microsoft", "Information Technology"),
-    "MAA": ("Mid-America Apartment", "Real Estate"),
-    "MRNA": ("Moderna", "Health Care"),
-    "MHK": ("Mohawk Industries", "Consumer Discretionary"),
-    "MOH": ("Molina Healthcare", "Health Care"),
-    "TAP": ("Molson Coors", "Consumer Staples"),
-    "MDLZ": ("Mondelez", "Consumer Staples"),
-    "MPWR": ("Monolithic Power", "Information Technology"),
-    "MNST": ("Monster Beverage", "Consumer Staples"),
-    "MCO": ("Moody\'s", "Financials"),
-    "MS": ("Morgan Stanley", "Financials"),
-    "MOS": ("Mosaic", "Materials"),
-    "MSI": ("Motorola Solutions", "Information Technology"),
-    "MSCI": ("MSCI Inc", "Financials"),
-    "NDAQ": ("Nasdaq Inc", "Financials"),
-    "NTAP": ("NetApp", "Information Technology"),
-    "NFLX": ("Netflix", "Communication Services"),
-    "NEM": ("Newmont", "Materials"),
-    "NWSA": ("News Corp (A)", "Communication Services"),
-    "NWS": ("News Corp (B)", "Communication Services"),
-    "NEE": ("NextEra Energy", "Utilities"),
-    "NKE": ("Nike", "Consumer Discretionary"),
-    "NI": ("NiSource", "Utilities"),
-    "NDSN": ("Nordson", "Industrials"),
-    "NSC": ("Norfolk Southern", "Industrials"),
-    "NTRS": ("Northern Trust", "Financials"),
-    "NOC": ("Northrop Grumman", "Industrials"),
-    "NCLH": ("Norwegian Cruise Line", "Consumer Discretionary"),
-    "NRG": ("NRG Energy", "Utilities"),
-    "NUE": ("Nucor", "Materials"),
-    "NVDA": ("NVIDIA", "Information Technology"),
-    "NVR": ("NVR Inc", "Consumer Discretionary"),
-    "NXPI": ("NXP Semiconductors", "Information Technology"),
-    "ORLY": ("O\'Reilly Automotive", "Consumer Discretionary"),
-    "OXY": ("Occidental Petroleum", "Energy"),
-    "ODFL": ("Old Dominion", "Industrials"),
-    "OMC": ("Omnicom", "Communication Services"),
-    "ON": ("ON Semiconductor", "Information Technology"),
-    "OKE": ("Oneok", "Energy"),
-    "ORCL": ("Oracle", "Information Technology"),
-    "OTIS": ("Otis Worldwide", "Industrials"),
-    "PCAR": ("Paccar", "Industrials"),
-    "PKG": ("Packaging Corp", "Materials"),
-    "PLTR": ("Palantir", "Information Technology"),
-    "PANW": ("Palo Alto Networks", "Information Technology"),
-    "PARA": ("Paramount Global", "Communication Services"),
-    "PH": ("Parker Hannifin", "Industrials"),
-    "PAYX": ("Paychex", "Industrials"),
-    "PAYC": ("Paycom", "Industrials"),
-    "PYPL": ("PayPal", "Financials"),
-    "PNR": ("Pentair", "Industrials"),
-    "PEP": ("PepsiCo", "Consumer Staples"),
-    "PFE": ("Pfizer", "Health Care"),
-    "PCG": ("PG&E", "Utilities"),
-    "PM": ("Philip Morris", "Consumer Staples"),
-    "PSX": ("Phillips 66", "Energy"),
-    "PNW": ("Pinnacle West", "Utilities"),
-    "PNC": ("PNC Financial", "Financials"),
-    "POOL": ("Pool Corporation", "Consumer Discretionary"),
-    "PPG": ("PPG Industries", "Materials"),
-    "PPL": ("PPL Corporation", "Utilities"),
-    "PFG": ("Principal Financial", "Financials"),
-    "PG": ("Procter & Gamble", "Consumer Staples"),
-    "PGR": ("Progressive", "Financials"),
-    "PLD": ("Prologis", "Real Estate"),
-    "PRU": ("Prudential Financial", "Financials"),
-    "PEG": ("PSEG", "Utilities"),
-    "PTC": ("PTC Inc", "Information Technology"),
-    "PSA": ("Public Storage", "Real Estate"),
-    "PHM": ("PulteGroup", "Consumer Discretionary"),
-    "PWR": ("Quanta Services", "Industrials"),
-    "QCOM": ("Qualcomm", "Information Technology"),
-    "DGX": ("Quest Diagnostics", "Health Care"),
-    "RL": ("Ralph Lauren", "Consumer Discretionary"),
-    "RJF": ("Raymond James", "Financials"),
-    "RTX": ("RTX Corporation", "Industrials"),
-    "O": ("Realty Income", "Real Estate"),
-    "REG": ("Regency Centers", "Real Estate"),
-    "REGN": ("Regeneron", "Health Care"),
-    "RF": ("Regions Financial", "Financials"),
-    "RSG": ("Republic Services", "Industrials"),
-    "RMD": ("ResMed", "Health Care"),
-    "RVTY": ("Revvity", "Health Care"),
-    "ROK": ("Rockwell Automation", "Industrials"),
-    "ROL": ("Rollins", "Industrials"),
-    "ROP": ("Roper Technologies", "Information Technology"),
-    "ROST": ("Ross Stores", "Consumer Discretionary"),
-    "RCL": ("Royal Caribbean", "Consumer Discretionary"),
-    "SPGI": ("S&P Global", "Financials"),
-    "CRM": ("Salesforce", "Information Technology"),
-    "SBAC": ("SBA Communications", "Real Estate"),
-    "SLB": ("Schlumberger", "Energy"),
-    "STX": ("Seagate Technology", "Information Technology"),
-    "SRE": ("Sempra", "Utilities"),
-    "NOW": ("ServiceNow", "Information Technology"),
-    "SHW": ("Sherwin-Williams", "Materials"),
-    "SPG": ("Simon Property Group", "Real Estate"),
-    "SWKS": ("Skyworks Solutions", "Information Technology"),
-    "SJM": ("J.M. Smucker", "Consumer Staples"),
-    "SW": ("Smurfit Westrock", "Materials"),
-    "SNA": ("Snap-on", "Industrials"),
-    "SOLV": ("Solventum", "Health Care"),
-    "SO": ("Southern Company", "Utilities"),
-    "LUV": ("Southwest Airlines", "Industrials"),
-    "SWK": ("Stanley Black & Decker", "Industrials"),
-    "SBUX": ("Starbucks", "Consumer Discretionary"),
-    "STT": ("스테이트 스트리트", "Financials"),
-    "STLD": ("Steel Dynamics", "Materials"),
-    "STE": ("Steris", "Health Care"),
-    "SYK": ("Stryker", "Health Care"),
-    "SMCI": ("Supermicro", "Information Technology"),
-    "SYF": ("Synchrony Financial", "Financials"),
-    "SNPS": ("Synopsys", "Information Technology"),
-    "SYY": ("Sysco", "Consumer Staples"),
-    "TMUS": ("T-Mobile US", "Communication Services"),
-    "TROW": ("T. Rowe Price", "Financials"),
-    "TTWO": ("Take-Two Interactive", "Communication Services"),
-    "TPR": ("Tapestry", "Consumer Discretionary"),
-    "TRGP": ("Targa Resources", "Energy"),
-    "TGT": ("Target", "Consumer Staples"),
-    "TEL": ("TE Connectivity", "Information Technology"),
-    "TDY": ("Teledyne Technologies", "Information Technology"),
-    "TER": ("Teradyne", "Information Technology"),
-    "TSLA": ("Tesla", "Consumer Discretionary"),
-    "TXN": ("Texas Instruments", "Information Technology"),
-    "TPL": ("Texas Pacific Land", "Energy"),
-    "TXT": ("Textron", "Industrials"),
-    "TMO": ("Thermo Fisher", "Health Care"),
-    "TJX": ("TJX Companies", "Consumer Discretionary"),
-    "TKO": ("TKO Group", "Communication Services"),
-    "TSCO": ("Tractor Supply", "Consumer Discretionary"),
-    "TT": ("Trane Technologies", "Industrials"),
-    "TDG": ("TransDigm", "Industrials"),
-    "TRV": ("Travelers", "Financials"),
-    "TRMB": ("Trimble", "Information Technology"),
-    "TFC": ("Truist Financial", "Financials"),
-    "TYL": ("Tyler Technologies", "Information Technology"),
-    "TSN": ("Tyson Foods", "Consumer Staples"),
-    "USB": ("U.S. Bancorp", "Financials"),
-    "UBER": ("Uber", "Industrials"),
-    "UDR": ("UDR Inc", "Real Estate"),
-    "ULTA": ("Ulta Beauty", "Consumer Discretionary"),
-    "UNP": ("Union Pacific", "Industrials"),
-    "UAL": ("United Airlines", "Industrials"),
-    "UPS": ("UPS", "Industrials"),
-    "URI": ("United Rentals", "Industrials"),
-    "UNH": ("UnitedHealth Group", "Health Care"),
-    "UHS": ("Universal Health Services", "Health Care"),
-    "VLO": ("Valero Energy", "Energy"),
-    "VTR": ("Ventas", "Real Estate"),
-    "VLTO": ("Veralto", "Industrials"),
-    "VRSN": ("Verisign", "Information Technology"),
-    "VRSK": ("Verisk Analytics", "Industrials"),
-    "VZ": ("Verizon", "Communication Services"),
-    "VRTX": ("Vertex Pharmaceuticals", "Health Care"),
-    "VTRS": ("Viatris", "Health Care"),
-    "VICI": ("Vici Properties", "Real Estate"),
-    "V": ("Visa", "Financials"),
-    "VST": ("Vistra", "Utilities"),
-    "VMC": ("Vulcan Materials", "Materials"),
-    "WRB": ("W.R. Berkley", "Financials"),
-    "GWW": ("W.W. Grainger", "Industrials"),
-    "WAB": ("Wabtec", "Industrials"),
-    "WBA": ("Walgreens", "Consumer Staples"),
-    "WMT": ("Walmart", "Consumer Staples"),
-    "DIS": ("Walt Disney", "Communication Services"),
-    "WBD": ("워너 브라더스 디스커버리", "Communication Services"),
-    "WM": ("Waste Management", "Industrials"),
-    "WAT": ("Waters Corporation", "Health Care"),
-    "WEC": ("WEC Energy", "Utilities"),
-    "WFC": ("Wells Fargo", "Financials"),
-    "WELL": ("Welltower", "Real Estate"),
-    "WST": ("West Pharmaceutical", "Health Care"),
-    "WDC": ("Western Digital", "Information Technology"),
-    "WY": ("Weyerhaeuser", "Real Estate"),
-    "WSM": ("Williams-Sonoma", "Consumer Discretionary"),
-    "WMB": ("Williams Companies", "Energy"),
-    "WTW": ("윌리스 타워스 왓슨", "Financials"),
-    "WDAY": ("워크데이", "Information Technology"),
-    "WYNN": ("윈 리조트", "Consumer Discretionary"),
-    "XEL": ("엑셀 에너지", "Utilities"),
-    "XYL": ("자일럼", "Industrials"),
-    "YUM": ("얌! 브랜즈", "Consumer Discretionary"),
-    "ZBRA": ("지브라 테크놀로지스", "Information Technology"),
-    "ZBH": ("짐머바이오메트", "Health Care"),
-    "ZTS": ("조에티스", "Health Care"),
-}
+import analytics
+import artifacts
+import earnings
+import registry
+import snapshots
+import store
+from yfcache import YFCache, CacheMiss, ALL_GROUPS, SLOW_GROUPS, DEFAULT_DIR as CACHE_DIR, DEFAULT_MAX_BYTES as CACHE_MAX_BYTES
+from telemetry import Telemetry, payload_bytes, REPORT_PATH, SUMMARY_PATH
+from retry import Retry
 
 KST = timezone(timedelta(hours=9))
 
+# yfinance (and with it pandas and requests) is imported on the first
+# request, so importing this module stays cheap. Tests may assign a stand-in.
+yf = None
+
+
+def _yfinance():
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
+
+
+# ─── Fetch engine settings ───
+DEFAULT_WORKERS = 8        # concurrent tickers in flight
+DEFAULT_RATE = 5.0         # yfinance requests per second (token bucket ceiling)
+THROTTLE_PAUSE = 5.0       # seconds the whole pool waits after a rate-limit error
+HISTORY_PERIOD = "5y"      # quarterly price history window for the P/E history
+HISTORY_DAYS = 5 * 366     # the same window, for reading the snapshot store
+HISTORY_INTERVAL = "3mo"
+HISTORY_CHUNK = 100        # tickers per multi-ticker yf.download request
+QUOTE_PERIOD = "1y"        # daily bars the cached-info quote fields are rebuilt from
+QUOTE_INTERVAL = "1d"
+
+# ─── Checkpoint settings ───
+STATE_PATH = "data/_state.json"
+STATE_VERSION = 2
+CHECKPOINT_EVERY = 10      # flush the state file after this many finished tickers,
+CHECKPOINT_BUDGET = 0.1    # but spend at most this fraction of wall time rewriting it
+RESUME_MAX_AGE = 12.0      # hours a checkpointed result stays reusable with --resume
+FUNDAMENTALS_MAX_AGE = 7.0 # days before --incremental refetches a ticker's full info
+OUTPUT_PATH = "data/sp500_data.json"
+SHARD_DIR = "data/shards"  # per-shard records of a --shard run, combined by --merge
+
+
+class TokenBucket:
+    """Thread-safe token bucket pacing yfinance requests across workers.
+
+    The fill rate adapts AIMD-style: a throttling error halves it and pauses
+    every worker, and each successful ticker nudges it back toward the ceiling.
+    """
+
+    def __init__(self, rate, min_rate=0.25):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated
+                if elapsed > 0:
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.updated - now, 0) + (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self, pause=THROTTLE_PAUSE):
+        """Back off after the upstream signalled rate limiting."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + pause)
+
+    def succeeded(self):
+        """Additively recover the rate after a successful ticker."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.02)
+
+
+class Checkpoint:
+    """Per-ticker progress and partial results persisted to ``data/_state.json``.
+
+    Layout: {"version", "lastRun",
+             "tickers": {ticker: {"fetchedAt", "ok", "result", "nextEarnings"}}}.
+    Files from an older layout are discarded. Writes go to a temp file that
+    is renamed over the original, so a killed run never leaves a torn file.
+    Every write rewrites the whole file, so flushes are spaced out to keep
+    their cost under CHECKPOINT_BUDGET of the run as the state grows.
+    """
+
+    def __init__(self, path=STATE_PATH, every=CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.pending = 0
+        self.next_write = 0.0
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        if self.state.get("version") != STATE_VERSION:
+            self.state = {"version": STATE_VERSION, "lastRun": None, "tickers": {}}
+
+    def fresh_results(self, tickers, max_age_hours):
+        """Results fetched successfully within the freshness window, by ticker."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        fresh = {}
+        for t in tickers:
+            entry = self.state["tickers"].get(t)
+            if entry and entry.get("ok") and datetime.fromisoformat(entry["fetchedAt"]) >= cutoff:
+                fresh[t] = entry["result"]
+        return fresh
+
+    def fundamentals_stale(self, ticker, max_age_days):
+        """True if the last full fetch is too old or an earnings report came out since."""
+        entry = self.state["tickers"].get(ticker)
+        if not entry or not entry.get("ok"):
+            return True
+        now = datetime.now(timezone.utc)
+        if now - datetime.fromisoformat(entry["fetchedAt"]) > timedelta(days=max_age_days):
+            return True
+        earnings = entry.get("nextEarnings")
+        return bool(earnings and now.timestamp() >= earnings)
+
+    def record(self, ticker, result, meta=None):
+        with self.lock:
+            self.state["tickers"][ticker] = {
+                "fetchedAt": datetime.now(timezone.utc).isoformat(),
+                "ok": result is not None,
+                "result": result,
+                **(meta or {}),
+            }
+            self.pending += 1
+            if self.pending >= self.every and time.monotonic() >= self.next_write:
+                self._write()
+
+    def flush(self, finished=False):
+        with self.lock:
+            if finished:
+                self.state["lastRun"] = datetime.now(KST).isoformat()
+            self._write()
+
+    def _write(self):
+        started = time.monotonic()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.pending = 0
+        now = time.monotonic()
+        self.next_write = now + (now - started) / CHECKPOINT_BUDGET
+
 
 def safe_get(info, key, default=None):
     """Safely get a value from yfinance info dict."""
@@ -534,223 +187,857 @@ def safe_get(info, key, default=None):
         return default
 
 
-def fetch_stock_data(ticker, name, sector):
-    """Fetch all data for a single stock using yfinance."""
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info or {}
-
-        price = safe_get(info, 'currentPrice') or safe_get(info, 'regularMarketPrice')
-        if not price:
-            return None
-
-        pe = safe_get(info, 'trailingPE')
-        fwd_pe = safe_get(info, 'forwardPE')
-        pb = safe_get(info, 'priceToBook')
-        ps = safe_get(info, 'priceToSalesTrailing12Months')
-        peg = safe_get(info, 'pegRatio')
-        ev_ebitda = safe_get(info, 'enterpriseToEbitda')
-        div_yield = safe_get(info, 'dividendYield')
-        roe = safe_get(info, 'returnOnEquity')
-        mkt_cap = safe_get(info, 'marketCap')
-        high52 = safe_get(info, 'fiftyTwoWeekHigh')
-        low52 = safe_get(info, 'fiftyTwoWeekLow')
-
-        # 52w discount
-        discount52w = None
-        if high52 and price:
-            discount52w = round((price - high52) / high52 * 100, 2)
-
-        # P/E History: get quarterly EPS + historical prices
-        pe_history = []
-        try:
-            # Get 5 years of quarterly prices (last trading day of each quarter)
-            hist = stock.history(period="5y", interval="3mo")
-            earnings = safe_get(info, 'trailingEps')
-
-            if not hist.empty and pe and pe > 0 and pe < 500:
-                # Use current P/E as anchor and estimate historical P/E from price ratios
-                current_price = price
-                for date, row in hist.iterrows():
-                    hist_price = row.get('Close')
-                    if hist_price and hist_price > 0:
-                        # Estimate historical P/E using price ratio
-                        est_pe = pe * (hist_price / current_price)
-                        if 0 < est_pe < 500:
-                            pe_history.append({
-                                "date": date.strftime("%Y-%m"),
-                                "pe": round(est_pe, 1)
-                            })
-        except Exception:
-            pass
-
-        # Ensure current P/E is the last entry
-        if pe and 0 < pe < 500:
-            now_date = datetime.now().strftime("%Y-%m")
-            if not pe_history or pe_history[-1]["date"] != now_date:
-                pe_history.append({"date": now_date, "pe": round(pe, 1)})
-
-        # Calculate percentile from pe_history
-        pe_percentile = None
-        if pe and pe_history and len(pe_history) >= 3:
-            all_pes = [p["pe"] for p in pe_history if p["pe"] > 0]
-            if all_pes:
-                below = sum(1 for p in all_pes if p < pe)
-                pe_percentile = round(below / len(all_pes) * 100)
-
-        # Historical performance: find similar P/E periods
-        hist_perf = None
-        if pe and pe_history and len(pe_history) >= 5:
-            cases = []
-            for i, ph in enumerate(pe_history[:-1]):
-                if abs(ph["pe"] - pe) / pe < 0.15:  # within 15%
-                    # Estimate 6-month return using subsequent price data
-                    if i + 2 < len(pe_history):
-                        ret = round((pe_history[i+2]["pe"] / ph["pe"] - 1) * 100 * (pe / pe_history[i+2]["pe"]), 1)
-                        # Simplify: use price change proxy
-                        try:
-                            p_start = ph["pe"]
-                            p_end = pe_history[min(i+2, len(pe_history)-1)]["pe"]
-                            ret = round((p_end / p_start - 1) * 100, 1)
-                        except:
-                            ret = 0
-                        cases.append({"date": ph["date"], "pe": ph["pe"], "return6m": ret})
-
-            if cases:
-                returns = [c["return6m"] for c in cases]
-                hist_perf = {
-                    "similarCount": len(cases),
-                    "avg6mReturn": round(sum(returns) / len(returns), 1),
-                    "winRate": round(sum(1 for r in returns if r > 0) / len(returns) * 100),
-                    "cases": cases[:6]
-                }
-
-        # Value score calculation
-        value_score = None
-        if pe and pe > 0:
-            scores = []
-            if pe: scores.append(max(0, min(100, 100 - (pe / 50 * 100))))
-            if fwd_pe: scores.append(max(0, min(100, 100 - (fwd_pe / 40 * 100))))
-            if pb: scores.append(max(0, min(100, 100 - (pb / 20 * 100))))
-            if ps: scores.append(max(0, min(100, 100 - (ps / 15 * 100))))
-            if peg and peg > 0: scores.append(max(0, min(100, 100 - (peg / 3 * 100))))
-            if discount52w is not None: scores.append(max(0, min(100, 50 + abs(discount52w) * (1 if discount52w < 0 else -1))))
-            if scores:
-                value_score = round(sum(scores) / len(scores))
-
-        return {
-            "ticker": ticker,
-            "name": name,
-            "sector": sector,
-            "price": price,
-            "marketCap": mkt_cap,
-            "pe": round(pe, 2) if pe else None,
-            "forwardPE": round(fwd_pe, 2) if fwd_pe else None,
-            "pb": round(pb, 2) if pb else None,
-            "ps": round(ps, 2) if ps else None,
-            "peg": round(peg, 2) if peg else None,
-            "evEbitda": round(ev_ebitda, 2) if ev_ebitda else None,
-            "dividendYield": round(div_yield * 100, 2) if div_yield else None,
-            "roe": round(roe * 100, 2) if roe else None,
-            "high52w": high52,
-            "low52w": low52,
-            "discount52w": discount52w,
-            "valueScore": value_score,
-            "pePercentile": pe_percentile,
-            "peRank": round(pe / 50 * 100) if pe else None,
-            "peHistory": pe_history,
-            "histPerformance": hist_perf,
-        }
-    except Exception as e:
-        print(f"  ⚠️ Error fetching {ticker}: {e}")
+def _acquire(limiter, event):
+    """Take a limiter token, adding the time spent waiting to the telemetry event."""
+    if limiter:
+        start = time.perf_counter()
+        limiter.acquire()
+        event["waitMs"] = round(event.get("waitMs", 0) + (time.perf_counter() - start) * 1000, 3)
+
+
+def _naive(obj):
+    """Drop the timezone from a history index so cached and fresh frames align."""
+    if getattr(obj.index, "tz", None) is not None:
+        obj = obj.copy()
+        obj.index = obj.index.tz_localize(None)
+    return obj
+
+
+def fetch_price_history(tickers, limiter, chunk_size=HISTORY_CHUNK, cache=None, telemetry=None, retry=None):
+    """Download quarterly closes for many tickers in a few multi-ticker requests.
+
+    Returns a DataFrame of Close prices (rows = bar dates, one column per
+    ticker). Cached series are reused and only the rest is downloaded.
+    Tickers a batch could not resolve are left out, and fetch_stock_data
+    falls back to a per-ticker history call for them, as it does for
+    batches that still fail after ``retry``. Each batch is one "download"
+    event in ``telemetry``.
+    """
+    telemetry = telemetry or Telemetry()
+    retry = retry or Retry(limiter)
+    frames = []
+    missing = tickers
+    if cache:
+        hits = [cache.closes(t, HISTORY_PERIOD, HISTORY_INTERVAL) for t in tickers]
+        missing = [t for t, h in zip(tickers, hits) if h is None]
+        hits = [h for h in hits if h is not None]
+        if hits:
+            import pandas as pd
+            frames.append(pd.concat(hits, axis=1))
+            print(f"  💾 quarterly closes for {len(hits)} tickers served from cache")
+        if cache.offline:
+            missing = []
+
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        with telemetry.span("download", tickers=len(chunk)) as event:
+            def request():
+                _acquire(limiter, event)
+                return _yfinance().download(chunk, period=HISTORY_PERIOD, interval=HISTORY_INTERVAL,
+                                   group_by="ticker", auto_adjust=True, progress=False)
+            try:
+                data = retry.call(request, event)
+                event["bytes"] = payload_bytes(data)
+            except Exception as e:
+                data = None
+                print(f"  ⚠️ Batch history failed for {chunk[0]}..{chunk[-1]}: {e}")
+        if data is None or data.empty:
+            continue
+        closes = _naive(data.xs("Close", axis=1, level=1).dropna(axis=1, how="all"))
+        if cache:
+            for t in closes.columns:
+                cache.put_closes(t, HISTORY_PERIOD, HISTORY_INTERVAL, closes[t])
+        frames.append(closes)
+        print(f"  [{min(start + chunk_size, len(missing))}/{len(missing)}] "
+              f"quarterly closes for {closes.shape[1]} tickers", flush=True)
+
+    if not frames:
         return None
+    return frames[0].join(frames[1:], how="outer") if len(frames) > 1 else frames[0]
 
 
-def main():
-    print("=" * 60)
-    print("  S&P 500 Value Screener - Data Fetcher (yfinance)")
-    print(f"  Time: {datetime.now(KST).strftime('%Y-%m-%d %H:%M KST')}")
-    print("=" * 60)
+def discount_from_high(price, high52):
+    """Percent distance of the price from its 52-week high."""
+    if high52 and price:
+        return round((price - high52) / high52 * 100, 2)
+    return None
+
+
+def next_earnings(info):
+    """Earliest announced earnings time still ahead (epoch seconds), if any."""
+    now = time.time()
+    upcoming = [ts for ts in (safe_get(info, 'earningsTimestampStart'), safe_get(info, 'earningsTimestamp'))
+                if isinstance(ts, (int, float)) and ts > now]
+    return min(upcoming) if upcoming else None
+
+
+def fetch_latest_prices(tickers, limiter, chunk_size=HISTORY_CHUNK, telemetry=None, retry=None):
+    """Latest daily close for every ticker via multi-ticker downloads. {ticker: price}"""
+    telemetry = telemetry or Telemetry()
+    retry = retry or Retry(limiter)
+    prices = {}
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        with telemetry.span("prices", tickers=len(chunk)) as event:
+            def request():
+                _acquire(limiter, event)
+                return _yfinance().download(chunk, period="5d", interval="1d",
+                                   group_by="ticker", auto_adjust=True, progress=False)
+            try:
+                data = retry.call(request, event)
+                event["bytes"] = payload_bytes(data)
+            except Exception as e:
+                data = None
+                print(f"  ⚠️ Batch prices failed for {chunk[0]}..{chunk[-1]}: {e}")
+        if data is None or data.empty:
+            continue
+        last = data.xs("Close", axis=1, level=1).ffill().iloc[-1]
+        prices.update({t: float(v) for t, v in last.items() if v == v and v > 0})
+        print(f"  [{min(start + chunk_size, len(tickers))}/{len(tickers)}] latest prices", flush=True)
+    return prices
+
+
+def fetch_quotes(tickers, limiter, chunk_size=HISTORY_CHUNK, telemetry=None, retry=None):
+    """Last close and 52-week range from a year of daily bars. {ticker: (price, high52, low52)}
+
+    Used for tickers whose cached info still has fresh fundamentals but a
+    stale quote group, so a handful of multi-ticker requests stand in for a
+    Ticker.info call each. Bars are unadjusted, like Yahoo's own quote fields.
+    """
+    telemetry = telemetry or Telemetry()
+    retry = retry or Retry(limiter)
+    quotes = {}
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        with telemetry.span("quotes", tickers=len(chunk)) as event:
+            def request():
+                _acquire(limiter, event)
+                return _yfinance().download(chunk, period=QUOTE_PERIOD, interval=QUOTE_INTERVAL,
+                                   group_by="ticker", auto_adjust=False, progress=False)
+            try:
+                data = retry.call(request, event)
+                event["bytes"] = payload_bytes(data)
+            except Exception as e:
+                data = None
+                print(f"  ⚠️ Batch quotes failed for {chunk[0]}..{chunk[-1]}: {e}")
+        if data is None or data.empty:
+            continue
+        last = data.xs("Close", axis=1, level=1).ffill().iloc[-1]
+        high = data.xs("High", axis=1, level=1).max()
+        low = data.xs("Low", axis=1, level=1).min()
+        # Rounded to cents like the quote fields of Ticker.info
+        quotes.update({t: (round(float(v), 2), round(float(high[t]), 2), round(float(low[t]), 2))
+                       for t, v in last.items() if v == v and v > 0})
+        print(f"  [{min(start + chunk_size, len(tickers))}/{len(tickers)}] quotes", flush=True)
+    return quotes
+
+
+def quote_fields(info, quote):
+    """The "quote" group of Ticker.info rebuilt from ``quote`` and the slower fields.
+
+    Yahoo derives them the same way: the P/Es are the price over trailing
+    and forward EPS (no trailing P/E below zero earnings) and the market cap
+    is the price times the shares outstanding.
+    """
+    price, high52, low52 = quote
+    eps, fwd_eps, shares = (safe_get(info, k) for k in ("trailingEps", "forwardEps", "sharesOutstanding"))
+    return {
+        "currentPrice": price,
+        "regularMarketPrice": price,
+        "marketCap": round(price * shares) if shares else None,
+        "trailingPE": price / eps if eps and eps > 0 else None,
+        "forwardPE": price / fwd_eps if fwd_eps else None,
+        "fiftyTwoWeekHigh": high52,
+        "fiftyTwoWeekLow": low52,
+    }
+
+
+def reprice_stock(stock, price):
+    """Roll a previous record forward to a new price without refetching info.
+
+    Per-share fundamentals (EPS, book value, sales, growth) are held
+    constant, so every price multiple scales by price / old price (EV/EBITDA
+    approximately, as if net debt were zero). Closed quarters of the P/E
+    history are unchanged; analytics.build_records moves the quarter still
+    in progress to the new P/E, as it does for a full fetch.
+    Returns a fetched item for analytics.build_records.
+    """
+    ratio = price / stock["price"]
+    record = dict(stock, price=price)
+    for key in ("pe", "forwardPE", "pb", "ps", "peg", "evEbitda"):
+        if record[key] is not None:
+            record[key] = round(record[key] * ratio, 2)
+    if record["marketCap"]:
+        record["marketCap"] = round(record["marketCap"] * ratio)
+    if record["dividendYield"]:
+        record["dividendYield"] = round(record["dividendYield"] / ratio, 2)
+    if record["high52w"] and price > record["high52w"]:
+        record["high52w"] = price
+    if record["low52w"] and price < record["low52w"]:
+        record["low52w"] = price
+    record["discount52w"] = discount_from_high(price, record["high52w"])
+    pe = record["pe"]
+    record["peRank"] = round(pe / 50 * 100) if pe else None
+
+    history = list(stock["peHistory"] or [])
+    # The previous run's current-P/E anchor sits off the quarterly grid; drop it
+    if len(history) >= 2 and (analytics.month_index(history[-1]["date"])
+                              - analytics.month_index(history[-2]["date"])) < analytics.BAR_MONTHS:
+        history.pop()
+
+    return {
+        "record": record,
+        "inputs": {"price": price, "pe": pe, "forwardPE": record["forwardPE"],
+                   "pb": record["pb"], "ps": record["ps"], "peg": record["peg"]},
+        "history": {"months": [p["date"] for p in history], "pe": [p["pe"] for p in history]},
+    }
+
+
+def fetch_stock_data(ticker, name, sector, limiter=None, closes=None, cache=None, meta=None,
+                     telemetry=None, retry=None, earnings_dir=earnings.EARNINGS_DIR, quote=None):
+    """Fetch all data for a single stock using yfinance.
+
+    Quarterly prices come from the shared ``closes`` frame when it has the
+    ticker, otherwise from a per-ticker history request. Both info and
+    history go through ``cache`` when one is given; with a bulk ``quote``
+    (fetch_quotes) only the slow info groups have to be fresh there, and the
+    quote fields are rebuilt from it. If ``meta`` is a dict it
+    receives bookkeeping that is not part of the record (next earnings date).
+    The info and per-ticker history requests go through ``retry`` and are
+    timed into ``telemetry``. Reported EPS is kept in ``earnings_dir``.
+
+    Returns a fetched item (record + unrounded inputs + quarterly closes) for
+    analytics.build_records, which fills in the P/E history and scores, or
+    None if Yahoo has no price for the ticker. Request errors that outlast
+    their retry policy are raised. The one exception is a history request
+    failing for good, which is reported and leaves the P/E history empty.
+    """
+    telemetry = telemetry or Telemetry()
+    retry = retry or Retry(limiter)
+    stock = _yfinance().Ticker(ticker)
+
+    with telemetry.span("info", ticker, cached=bool(cache)) as event:
+        def request():
+            _acquire(limiter, event)
+            return stock.info or {}
+
+        def fetch_info():
+            info = retry.call(request, event)
+            event["cached"] = False
+            event["bytes"] = payload_bytes(info)
+            return info
+
+        info = cache.info(ticker, fetch_info, SLOW_GROUPS if quote else ALL_GROUPS) if cache else fetch_info()
+        if quote and event["cached"]:
+            info = {**info, **quote_fields(info, quote)}
+
+    price = safe_get(info, 'currentPrice') or safe_get(info, 'regularMarketPrice')
+    if not price:
+        return None
+
+    pe = safe_get(info, 'trailingPE')
+    fwd_pe = safe_get(info, 'forwardPE')
+    pb = safe_get(info, 'priceToBook')
+    ps = safe_get(info, 'priceToSalesTrailing12Months')
+    peg = safe_get(info, 'pegRatio')
+    ev_ebitda = safe_get(info, 'enterpriseToEbitda')
+    div_yield = safe_get(info, 'dividendYield')
+    roe = safe_get(info, 'returnOnEquity')
+    mkt_cap = safe_get(info, 'marketCap')
+    high52 = safe_get(info, 'fiftyTwoWeekHigh')
+    low52 = safe_get(info, 'fiftyTwoWeekLow')
+
+    discount52w = discount_from_high(price, high52)
+
+    # Quarterly closes feed the P/E history in the analytics stage
+    history = {"months": [], "close": []}
+    # Get 5 years of quarterly prices (last trading day of each quarter)
+    if closes is not None and ticker in closes.columns:
+        hist = closes[ticker].dropna()
+    else:
+        hist = cache.closes(ticker, HISTORY_PERIOD, HISTORY_INTERVAL) if cache else None
+        if hist is None and cache:
+            try:
+                cache.history_miss(ticker, HISTORY_PERIOD, HISTORY_INTERVAL)
+            except CacheMiss as e:
+                # Offline with the info cached but not the prices: keep the ticker
+                print(f"  ⚠️ No price history for {ticker}, P/E history left empty: {e}")
+                import pandas as pd
+                hist = pd.DataFrame()
+        if hist is None:
+            with telemetry.span("history", ticker) as event:
+                def request():
+                    _acquire(limiter, event)
+                    return stock.history(period=HISTORY_PERIOD, interval=HISTORY_INTERVAL)
+                try:
+                    hist = retry.call(request, event)
+                    event["bytes"] = payload_bytes(hist)
+                except Exception as e:
+                    if retry.retriable(e):
+                        raise
+                    print(f"  ⚠️ No price history for {ticker}, P/E history left empty: {e}")
+                    import pandas as pd
+                    hist = pd.DataFrame()
+            hist = _naive(hist["Close"]) if not hist.empty else hist
+            if cache and not hist.empty:
+                cache.put_closes(ticker, HISTORY_PERIOD, HISTORY_INTERVAL, hist)
+
+    if not hist.empty:
+        history = {"months": [d.strftime("%Y-%m") for d in hist.index],
+                   "close": hist.to_numpy().tolist()}
+
+    # Reported EPS turns the closes into a real trailing P/E. Past quarters
+    # never change, so Yahoo is asked only after an earnings date (earnings.py)
+    reports = earnings.load(ticker, earnings_dir)
+    if earnings.due(reports) and not (cache and cache.offline):
+        with telemetry.span("earnings", ticker) as event:
+            def request():
+                _acquire(limiter, event)
+                return stock.get_earnings_dates(limit=earnings.quarters(reports))
+
+            try:
+                frame = retry.call(request, event)
+                event["bytes"] = payload_bytes(frame)
+            except Exception as e:
+                if retry.retriable(e):
+                    raise
+                print(f"  ⚠️ No earnings history for {ticker}, P/E history estimated from price: {e}")
+                frame = None
+        reports = earnings.merge(reports, ticker, earnings.parse(frame), next_earnings(info))
+        earnings.save(reports, earnings_dir)
+
+    if meta is not None:
+        meta["nextEarnings"] = next_earnings(info)
+
+    record = {
+        "ticker": ticker,
+        "name": name,
+        "sector": sector,
+        "price": price,
+        "marketCap": mkt_cap,
+        "pe": round(pe, 2) if pe else None,
+        "forwardPE": round(fwd_pe, 2) if fwd_pe else None,
+        "pb": round(pb, 2) if pb else None,
+        "ps": round(ps, 2) if ps else None,
+        "peg": round(peg, 2) if peg else None,
+        "evEbitda": round(ev_ebitda, 2) if ev_ebitda else None,
+        "dividendYield": round(div_yield * 100, 2) if div_yield else None,
+        "roe": round(roe * 100, 2) if roe else None,
+        "high52w": high52,
+        "low52w": low52,
+        "discount52w": discount52w,
+        "valueScore": None,
+        "pePercentile": None,
+        "peRank": round(pe / 50 * 100) if pe else None,
+        "peHistory": [],
+        "histPerformance": None,
+    }
+    inputs = {"price": price, "pe": pe, "forwardPE": fwd_pe, "pb": pb, "ps": ps, "peg": peg}
+    return {"record": record, "inputs": inputs, "history": history}
 
-    tickers = list(SP500.keys())
+
+def fetch_all(tickers, limiter, workers=DEFAULT_WORKERS, closes=None, checkpoint=None, cache=None,
+              universe=None, telemetry=None, retry=None, earnings_dir=earnings.EARNINGS_DIR, quotes=None):
+    """Fetch every ticker on a bounded thread pool.
+
+    Returns {ticker: result or None}. Completion order is arbitrary, so callers
+    should iterate ``tickers`` to keep the output ordering deterministic.
+    Each finished ticker is recorded in ``checkpoint`` when one is given.
+    ``universe`` maps ticker -> (name, sector) and defaults to today's
+    members of the default registry universe.
+    Reported EPS is read from and stored in ``earnings_dir``. ``quotes``
+    (fetch_quotes) lets cached info with a stale quote group be reused.
+    Tickers whose requests are still throttled or failing transiently after
+    ``retry`` gave up are queued and fetched once more in a second pass,
+    after everything else (and after any open circuit breaker has cooled).
+    Each ticker attempt is one "ticker" event in ``telemetry``.
+    """
+    universe = universe or registry.load().members()
+    telemetry = telemetry or Telemetry()
+    retry = retry or Retry(limiter)
     total = len(tickers)
-    print(f"\n📊 Fetching data for {total} S&P 500 stocks...\n")
+    results = {}
+    deferred = set()
+    progress = {"done": 0}
+    lock = threading.Lock()
 
-    stocks = []
-    errors = 0
+    def work(ticker, final):
+        name, sector = universe[ticker]
+        meta = {}
+        with telemetry.span("ticker", ticker, retries=int(final)) as event:
+            try:
+                result = fetch_stock_data(ticker, name, sector, limiter, closes, cache, meta, telemetry, retry,
+                                          earnings_dir, (quotes or {}).get(ticker))
+            except Exception as e:
+                event["error"] = type(e).__name__
+                if retry.retriable(e) and not final:
+                    return None, meta, True
+                print(f"  ⚠️ Error fetching {ticker}: {e}")
+                return None, meta, False
+            event["error"] = None if result else "NoData"
+            if result:
+                limiter.succeeded()
+            return result, meta, False
 
-    for i, ticker in enumerate(tickers):
-        name, sector = SP500[ticker]
-        pct = (i + 1) / total * 100
-        print(f"  [{i+1}/{total}] ({pct:.0f}%) {ticker} - {name}...", end=" ", flush=True)
+    def report(ticker, result, later=False):
+        with lock:
+            if not later:
+                progress["done"] += 1
+            i = progress["done"]
+            status = "⏳ Retrying at the end" if later else "❌ Failed"
+            if result:
+                pe = result["record"]["pe"]
+                status = "✅ " + (f"P/E={pe}" if pe else "P/E=N/A")
+            print(f"  [{i}/{total}] ({i / total * 100:.0f}%) {ticker} - {universe[ticker][0]}... {status}", flush=True)
 
-        result = fetch_stock_data(ticker, name, sector)
+    def run(batch, final):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(work, t, final): t for t in batch}
+            for fut in as_completed(futures):
+                ticker = futures[fut]
+                result, meta, later = fut.result()
+                if later:
+                    deferred.add(ticker)
+                    report(ticker, None, later=True)
+                    continue
+                results[ticker] = result
+                if checkpoint:
+                    checkpoint.record(ticker, result, meta)
+                report(ticker, result)
 
-        if result:
-            stocks.append(result)
-            pe_str = f"P/E={result['pe']}" if result['pe'] else "P/E=N/A"
-            print(f"✅ {pe_str}")
-        else:
-            errors += 1
-            print("❌ Failed")
+    run(tickers, final=False)
+    if deferred:
+        print(f"\n🔁 Second pass: retrying {len(deferred)} tickers that hit throttling or transient errors...")
+        retry.breaker.wait()
+        run([t for t in tickers if t in deferred], final=True)
 
-        # Small delay to avoid rate limiting
-        if (i + 1) % 10 == 0:
-            time.sleep(1)
+    return results
 
-    print(f"\n✅ Fetched {len(stocks)} stocks ({errors} errors)")
 
-    # Calculate sector averages
-    sector_data = {}
-    for s in stocks:
-        sec = s["sector"]
-        if sec not in sector_data:
-            sector_data[sec] = {"pe_vals": [], "pb_vals": [], "count": 0}
-        sector_data[sec]["count"] += 1
+def incremental_update(tickers, limiter, checkpoint, args, telemetry=None, retry=None):
+    """Reprice tickers from the previous output where fundamentals are still fresh.
+
+    Returns {ticker: repriced item}; everything else needs a full fetch.
+    """
+    try:
+        with open(OUTPUT_PATH, encoding="utf-8") as f:
+            previous = {s["ticker"]: s for s in json.load(f)["stocks"]}
+    except (OSError, ValueError, KeyError):
+        print(f"\n⚠️ No usable {OUTPUT_PATH}; running a full fetch")
+        return {}
+
+    candidates = [t for t in tickers if t in previous
+                  and not checkpoint.fundamentals_stale(t, args.fundamentals_age)]
+    print(f"\n💹 Incremental: downloading latest prices for {len(candidates)} tickers...")
+    prices = fetch_latest_prices(candidates, limiter, chunk_size=args.history_chunk, telemetry=telemetry,
+                                 retry=retry)
+    repriced = {t: reprice_stock(previous[t], prices[t]) for t in candidates if t in prices}
+    print(f"  ♻️  {len(repriced)} repriced locally, {len(tickers) - len(repriced)} need a full fetch")
+    return repriced
+
+
+class Aggregates:
+    """Sector averages and dashboard summary counters, kept as running totals."""
+
+    def __init__(self):
+        self.sectors = {}   # sector -> [P/E sum, P/E count, P/B sum, P/B count, stocks]
+        self.total = 0
+        self.pe_sum, self.pe_count = 0, 0
+        self.undervalued = self.overvalued = self.fair_value = 0
+
+    def add(self, s):
+        sec = self.sectors.setdefault(s["sector"], [0, 0, 0, 0, 0])
+        sec[4] += 1
+        self.total += 1
         if s["pe"] and 0 < s["pe"] < 500:
-            sector_data[sec]["pe_vals"].append(s["pe"])
+            sec[0] += s["pe"]
+            sec[1] += 1
+            self.pe_sum += s["pe"]
+            self.pe_count += 1
         if s["pb"] and 0 < s["pb"] < 200:
-            sector_data[sec]["pb_vals"].append(s["pb"])
-
-    sectors = {}
-    for sec, data in sector_data.items():
-        sectors[sec] = {
-            "avgPE": round(sum(data["pe_vals"]) / len(data["pe_vals"]), 1) if data["pe_vals"] else None,
-            "avgPB": round(sum(data["pb_vals"]) / len(data["pb_vals"]), 1) if data["pb_vals"] else None,
-            "count": data["count"]
+            sec[2] += s["pb"]
+            sec[3] += 1
+        score = s.get("valueScore")
+        if score:
+            if score >= 65:
+                self.undervalued += 1
+            elif score <= 35:
+                self.overvalued += 1
+            else:
+                self.fair_value += 1
+
+    def result(self):
+        """(sectors, summary) for the stocks added so far."""
+        sectors = {
+            sec: {
+                "avgPE": round(pe_sum / pe_n, 1) if pe_n else None,
+                "avgPB": round(pb_sum / pb_n, 1) if pb_n else None,
+                "count": count,
+            }
+            for sec, (pe_sum, pe_n, pb_sum, pb_n, count) in self.sectors.items()
         }
+        summary = {
+            "totalStocks": self.total,
+            "avgPE": round(self.pe_sum / self.pe_count, 1) if self.pe_count else 0,
+            "undervalued": self.undervalued,
+            "overvalued": self.overvalued,
+            "fairValue": self.fair_value,
+        }
+        return sectors, summary
 
-    # Summary
-    valid_pe = [s["pe"] for s in stocks if s["pe"] and 0 < s["pe"] < 500]
-    vs = [s["valueScore"] for s in stocks if s["valueScore"] is not None]
 
-    summary = {
-        "totalStocks": len(stocks),
-        "avgPE": round(sum(valid_pe) / len(valid_pe), 1) if valid_pe else 0,
-        "undervalued": sum(1 for s in stocks if s.get("valueScore") and s["valueScore"] >= 65),
-        "overvalued": sum(1 for s in stocks if s.get("valueScore") and s["valueScore"] <= 35),
-        "fairValue": sum(1 for s in stocks if s.get("valueScore") and 35 < s["valueScore"] < 65),
-    }
+def aggregate(stocks):
+    """Sector averages and the dashboard summary counters. Returns (sectors, summary)."""
+    totals = Aggregates()
+    for s in stocks:
+        totals.add(s)
+    return totals.result()
 
-    # Sort by P/E
-    stocks.sort(key=lambda x: x.get("pe") or 9999)
 
-    output = {
-        "lastUpdated": datetime.now(KST).strftime("%Y.%m.%d %H:%M KST"),
-        "summary": summary,
-        "stocks": stocks,
-        "sectors": sectors,
-    }
+class OutputWriter:
+    """Writes the dashboard JSON from records added one at a time.
+
+    Each record is serialized once into an anonymous spool file next to
+    ``path``; memory holds only its sort key and byte range plus the running
+    Aggregates, so the whole universe is never materialized a second time.
+    close() writes the full file with the stocks sorted by P/E (ties keep
+    their arrival order) and then the split artifacts from the same spool.
+    """
+
+    def __init__(self, path=OUTPUT_PATH):
+        self.path = path
+        self.dir = os.path.dirname(path) or "."
+        os.makedirs(self.dir, exist_ok=True)
+        self.spool = tempfile.TemporaryFile(dir=self.dir)
+        self.index = []   # (P/E sort key, arrival, offset, length)
+        self.totals = Aggregates()
+
+    def add(self, stock):
+        data = json.dumps(stock, ensure_ascii=False).encode()
+        self.index.append((stock.get("pe") or 9999, len(self.index), self.spool.tell(), len(data)))
+        self.spool.write(data)
+        self.totals.add(stock)
+
+    def _sorted(self):
+        """Serialized records in output order."""
+        self.index.sort()
+        for _, _, offset, length in self.index:
+            self.spool.seek(offset)
+            yield self.spool.read(length)
+
+    def close(self, columnar=False, sectors=None, summary=None):
+        """Write the full file and the artifacts. Returns (sectors, summary).
+
+        ``sectors``/``summary`` override the running aggregates.
+        """
+        if sectors is None or summary is None:
+            sectors, summary = self.totals.result()
+        updated = datetime.now(KST).strftime("%Y.%m.%d %H:%M KST")
+        head = json.dumps({"lastUpdated": updated, "summary": summary}, ensure_ascii=False)
+        tmp = f"{self.path}.tmp"
+        try:
+            # Same bytes json.dump gives for {"lastUpdated", "summary", "stocks", "sectors"}
+            with open(tmp, "wb") as f:
+                f.write(head[:-1].encode() + b', "stocks": [')
+                for i, data in enumerate(self._sorted()):
+                    f.write(b", " + data if i else data)
+                f.write(b'], "sectors": ' + json.dumps(sectors, ensure_ascii=False).encode() + b"}")
+            os.replace(tmp, self.path)
+            output = {"lastUpdated": updated, "summary": summary,
+                      "stocks": (json.loads(data) for data in self._sorted()), "sectors": sectors}
+            artifacts.write_split(output, self.dir, columnar=columnar)
+        finally:
+            self.spool.close()
+        return sectors, summary
+
+
+def write_output(stocks, sectors, summary, path=OUTPUT_PATH, columnar=False):
+    """Write the dashboard JSON for a list of records, sorted by P/E.
+
+    The full file is followed by the dashboard's slim index and per-sector
+    detail shards in the same directory (see artifacts.py); ``columnar``
+    stores the index's stocks as struct-of-arrays.
+    """
+    writer = OutputWriter(path)
+    for s in stocks:
+        writer.add(s)
+    writer.close(columnar, sectors, summary)
+
+
+def shard_spec(text):
+    """argparse type for --shard: 'K/N' -> (K, N) with 1 <= K <= N."""
+    try:
+        k, n = (int(x) for x in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N such as 3/8, got {text!r}") from None
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f"shard {k} is outside 1..{n}")
+    return k, n
+
+
+def _tagged(path, tag):
+    """data/_state.json, '3-of-8' -> data/_state.3-of-8.json (unchanged without a tag)."""
+    if not tag:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tag}{ext}"
+
+
+def shard_path(universe, k, n, shard_dir=SHARD_DIR):
+    return os.path.join(shard_dir, f"{universe}.{k}-of-{n}.json")
+
+
+def write_shard(path, universe, shard, tickers, stocks):
+    """Save one shard's finished records for merge_shards."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"universe": universe, "shard": list(shard),
+                   "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                   "tickers": tickers, "stocks": stocks}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def merge_shards(universe, n, shard_dir=SHARD_DIR):
+    """Records of all ``n`` shards of a sharded run, in constituent order.
+
+    Shard k holds every n-th constituent starting with the k-th, so
+    interleaving the shards' ticker lists restores the full order. Raises
+    ValueError if a shard file is missing or comes from a different split.
+    """
+    parts = []
+    for k in range(1, n + 1):
+        path = shard_path(universe, k, n, shard_dir)
+        try:
+            with open(path, encoding="utf-8") as f:
+                part = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"shard {k}/{n} is missing or unreadable: {path}") from None
+        if part["universe"] != universe or part["shard"] != [k, n]:
+            raise ValueError(f"{path} is not shard {k}/{n} of {universe}")
+        print(f"  🧩 {path}: {len(part['stocks'])} stocks, generated {part['generatedAt']}")
+        parts.append(part)
+
+    tickers = [None] * sum(len(p["tickers"]) for p in parts)
+    try:
+        for k, part in enumerate(parts):
+            tickers[k::n] = part["tickers"]
+    except ValueError:
+        raise ValueError("shards were cut from different constituent lists; rerun them together") from None
+    stocks = {s["ticker"]: s for p in parts for s in p["stocks"]}
+    return [stocks[t] for t in tickers if t in stocks]
+
+
+def shard_summaries(n, summary_path=SUMMARY_PATH):
+    """Run summaries the ``n`` shard jobs wrote next to ``summary_path``; unreadable ones are skipped."""
+    parts = []
+    for k in range(1, n + 1):
+        path = _tagged(summary_path, f"{k}-of-{n}")
+        try:
+            with open(path, encoding="utf-8") as f:
+                parts.append(json.load(f))
+        except (OSError, ValueError):
+            print(f"  ⚠️ No run summary for shard {k}/{n} ({path}), left out of the run report")
+    return parts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch S&P 500 valuation data via yfinance.")
+    parser.add_argument("--universe", default=registry.DEFAULT_UNIVERSE,
+                        help=f"constituents to screen: a name in universes/ or a CSV path "
+                             f"(default {registry.DEFAULT_UNIVERSE})")
+    parser.add_argument("--as-of", type=registry.iso_date,
+                        help="use the index membership on this date, YYYY-MM-DD (default today)")
+    parser.add_argument("--shard", type=shard_spec, metavar="K/N",
+                        help=f"fetch only every N-th constituent starting with the K-th and save the "
+                             f"records to {SHARD_DIR}/ for --merge")
+    parser.add_argument("--merge", type=int, metavar="N",
+                        help=f"combine the N shard files in {SHARD_DIR}/ into {OUTPUT_PATH}")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent tickers in flight (default {DEFAULT_WORKERS})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"max yfinance requests per second (default {DEFAULT_RATE})")
+    parser.add_argument("--history-chunk", type=int, default=HISTORY_CHUNK,
+                        help=f"tickers per batched history download (default {HISTORY_CHUNK})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"reuse tickers already fetched successfully in {STATE_PATH}")
+    parser.add_argument("--max-age", type=float, default=RESUME_MAX_AGE,
+                        help=f"hours a checkpointed result stays fresh for --resume (default {RESUME_MAX_AGE:g})")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"reprice the previous {OUTPUT_PATH} from bulk prices and refetch "
+                             "full info only where fundamentals are stale")
+    parser.add_argument("--fundamentals-age", type=float, default=FUNDAMENTALS_MAX_AGE,
+                        help=f"days before --incremental refetches full info (default {FUNDAMENTALS_MAX_AGE:g})")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help=f"on-disk yfinance response cache (default {CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=float, default=CACHE_MAX_BYTES / 2**20,
+                        help=f"cache size bound before LRU eviction (default {CACHE_MAX_BYTES // 2**20})")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    parser.add_argument("--offline", action="store_true",
+                        help="serve purely from the response cache, never hit the network")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write the dashboard index as struct-of-arrays columns")
+    args = parser.parse_args(argv)
+    if args.offline and args.incremental:
+        # Repricing needs today's bulk prices, which only the network has; the cached info
+        # already carries the price a cache-only run can give
+        parser.error("--incremental downloads the latest prices; drop it to run --offline from the cache")
+    return args
+
+
+def fetch_stocks(tickers, universe, checkpoint, args, telemetry):
+    """Fetch, reprice or resume every ticker and finish them into output records."""
+    total = len(tickers)
+    resumed = {}
+    if args.resume:
+        resumed = checkpoint.fresh_results(tickers, args.max_age)
+        print(f"\n♻️  Resuming: {len(resumed)} tickers fetched within {args.max_age:g}h reused")
+    pending = [t for t in tickers if t not in resumed]
+
+    limiter = TokenBucket(args.rate)
+    retry = Retry(limiter)
+    repriced = {}
+    if args.incremental and pending:
+        with telemetry.span("run.incremental", tickers=len(pending)):
+            repriced = incremental_update(pending, limiter, checkpoint, args, telemetry, retry)
+        pending = [t for t in pending if t not in repriced]
+
+    shard = f", shard {args.shard[0]}/{args.shard[1]}" if args.shard else ""
+    print(f"\n📊 Fetching data for {len(pending)} of {total} {args.universe} stocks "
+          f"({args.workers} workers, ≤{args.rate:g} req/s{shard})...\n")
+
+    cache = None
+    if not args.no_cache:
+        cache = YFCache(args.cache_dir, int(args.cache_max_mb * 2**20), offline=args.offline)
+    try:
+        if pending:
+            print("📈 Downloading quarterly price history in batches...")
+            with telemetry.span("run.history", tickers=len(pending)):
+                closes = fetch_price_history(pending, limiter, chunk_size=args.history_chunk,
+                                             cache=cache, telemetry=telemetry, retry=retry)
+            quotes = {}
+            # Cached fundamentals outlive the hourly quote group; reprice them in bulk
+            requote = [t for t in pending if cache and not cache.offline
+                       and cache.fresh(t, SLOW_GROUPS) and not cache.fresh(t, ["quote"])]
+            if requote:
+                print(f"💹 Downloading quotes for {len(requote)} tickers with cached fundamentals...")
+                with telemetry.span("run.quotes", tickers=len(requote)):
+                    quotes = fetch_quotes(requote, limiter, chunk_size=args.history_chunk,
+                                          telemetry=telemetry, retry=retry)
+            print()
+            with telemetry.span("run.fetch", tickers=len(pending)):
+                fetched = fetch_all(pending, limiter, workers=args.workers, closes=closes,
+                                    checkpoint=checkpoint, cache=cache, universe=universe,
+                                    telemetry=telemetry, retry=retry, quotes=quotes)
+        else:
+            fetched = {}
+    finally:
+        checkpoint.flush()
+    if cache:
+        print(f"\n💾 Cache: {cache.hits} hits, {cache.misses} misses")
+
+    results = {**resumed, **repriced, **fetched}
+    # Keep constituent order so the stable P/E sort below is reproducible
+    items = [results[t] for t in tickers if results[t]]
+    errors = total - len(items)
+
+    print(f"\n✅ Fetched {len(items)} stocks ({errors} errors)")
+
+    print("🧮 Computing P/E history, percentiles and value scores...")
+    with telemetry.span("run.observed"):
+        # Real P/E recorded by earlier runs replaces the estimate for closed quarters
+        since = datetime.now(timezone.utc) - timedelta(days=HISTORY_DAYS)
+        observed = snapshots.monthly(tickers, "pe", start=since.date())
+    with telemetry.span("run.earnings"):
+        reports = earnings.load_reports(tickers)
+    timings = {}
+    stocks = analytics.build_records(items, timings=timings, observed=observed, reports=reports)
+    for step, seconds in timings.items():
+        telemetry.add(f"run.analytics.{step}", seconds, tickers=len(items))
+    return stocks
+
+
+def publish(stocks, args, telemetry):
+    """Aggregate and write the dashboard data, then record the run's history. Returns the summary."""
+    with telemetry.span("run.write") as event:
+        # One pass: records are spooled and aggregated as they go by
+        writer = OutputWriter()
+        for s in stocks:
+            writer.add(s)
+        sectors, summary = writer.close(columnar=args.columnar)
+        event["bytes"] = os.path.getsize(OUTPUT_PATH)
+    with telemetry.span("run.snapshot"):
+        snapshots.append(stocks)
+    with telemetry.span("run.store"):
+        store.load(stocks)
+        store.sync()
+    return summary
+
+
+def print_report(report, report_path=REPORT_PATH, summary_path=SUMMARY_PATH):
+    print(f"\n⏱️  Run report: {report_path}, {summary_path} ({report['wallMs'] / 1000:.1f}s)")
+    for stage, st in report["stages"].items():
+        if not stage.startswith("run."):
+            print(f"  {stage:<9} n={st['count']:<5} p50={st['p50Ms']:.0f}ms p95={st['p95Ms']:.0f}ms "
+                  f"p99={st['p99Ms']:.0f}ms queued={st['waitMs'] / 1000:.1f}s "
+                  f"retries={st['retries']} errors={st['errors']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.offline and args.no_cache:
+        sys.exit("--offline needs the response cache; drop --no-cache")
+    if args.shard and args.merge:
+        sys.exit("--shard and --merge are separate steps")
+    print("=" * 60)
+    print("  S&P 500 Value Screener - Data Fetcher (yfinance)")
+    print(f"  Time: {datetime.now(KST).strftime('%Y-%m-%d %H:%M KST')}")
+    print("=" * 60)
+
+    try:
+        registered = registry.load(args.universe)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    universe = registered.members(args.as_of)
+    telemetry = Telemetry()
+
+    checkpoint = None
+    if args.merge:
+        try:
+            stocks = merge_shards(registered.name, args.merge)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        print(f"\n🧩 Merged {len(stocks)} stocks from {args.merge} shards of {registered.name}")
+    else:
+        tickers = list(universe)
+        tag = None
+        if args.shard:
+            k, n = args.shard
+            tickers, tag = tickers[k - 1::n], f"{k}-of-{n}"
+        checkpoint = Checkpoint(_tagged(STATE_PATH, tag))
+        stocks = fetch_stocks(tickers, universe, checkpoint, args, telemetry)
+        if args.shard:
+            path = shard_path(registered.name, k, n)
+            write_shard(path, registered.name, args.shard, tickers, stocks)
+            checkpoint.flush(finished=True)
+            paths = _tagged(REPORT_PATH, tag), _tagged(SUMMARY_PATH, tag)
+            report = telemetry.write(*paths)
+            print(f"\n🧩 Shard {k}/{n}: {len(stocks)} stocks saved to {path}")
+            print(f"  Run --merge {n} once all {n} shards are in {SHARD_DIR}/")
+            print_report(report, *paths)
+            return
 
-    os.makedirs("data", exist_ok=True)
-    with open("data/sp500_data.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False)
+    summary = publish(stocks, args, telemetry)
+    if checkpoint:
+        checkpoint.flush(finished=True)
+    report = telemetry.write(parts=shard_summaries(args.merge) if args.merge else ())
 
-    print(f"\n🎉 Data saved to data/sp500_data.json")
+    print(f"\n🎉 Data saved to {OUTPUT_PATH}")
     print(f"  📊 Total stocks: {summary['totalStocks']}")
     print(f"  📈 Avg P/E: {summary['avgPE']}")
     print(f"  🟢 Undervalued: {summary['undervalued']}")
     print(f"  🔴 Overvalued: {summary['overvalued']}")
+    print_report(report)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,48 @@
 #!/usr/bin/env python3
 """
 Sample data generator for testing the dashboard without API access.
-Run: python generate_sample.py
+
+Stocks are drawn in NumPy batches and then finished by
+analytics.build_records exactly like fetched data, so peHistory,
+pePercentile, histPerformance and the value score are real pipeline output
+over synthetic quarterly price paths. --size beyond the registry's members
+adds synthetic tickers (SYN000001, ...) spread over the same sectors, which
+makes it a load generator for the dashboard and the analytics step.
+
+Output goes to its own directory (sample/ unless --out says otherwise) laid
+out like data/, so a generated run never overwrites the fetched data or
+its published artifacts. No deltas are published, since generated data
+does not follow from the index before it. The API server takes it with
+python server.py --data sample/sp500_data.json.
+
+--null-rate blanks each optional field (and the price history) with that
+probability; --outlier-rate plants the extreme or negative multiples Yahoo
+data has (P/E in the thousands, negative PEG, ...).
+
+Run: python generate_sample.py [--out DIR] [--columnar]
+     python generate_sample.py --size 100000 --null-rate 0.05 --outlier-rate 0.01
 """
+import argparse
 import json
-import random
 import os
+import time
+from datetime import datetime, timezone, timedelta
 
-random.seed(42)
-
-SECTORS = {
-    "Technology": ["AAPL", "MSFT", "NVDA", "GOOG", "META", "AVGO", "ORCL", "CRM", "AMD", "ADBE", "INTC", "CSCO", "QCOM", "TXN", "NOW", "IBM", "PLTR", "ANET", "MU", "SNPS"],
-    "Financials": ["JPM", "V", "MA", "BAC", "WFC", "GS", "MS", "BLK", "C", "SCHW", "AXP", "PGR", "CB", "ICE", "CME", "MMC", "MCO", "AON", "MET", "AIG"],
-    "Healthcare": ["UNH", "LLY", "JNJ", "ABBV", "MRK", "TMO", "ABT", "PFE", "AMGN", "MDT", "BMY", "CVS", "CI", "ELV", "GILD", "ISRG", "VRTX", "SYK", "BSX", "ZTS"],
-    "Consumer Discretionary": ["AMZN", "TSLA", "HD", "MCD", "NKE", "LOW", "SBUX", "TJX", "BKNG", "CMG", "GM", "F", "ROST", "MAR", "HLT", "ORLY", "AZO", "DHI", "LULU", "DG"],
-    "Industrials": ["GE", "CAT", "UNP", "HON", "UPS", "RTX", "BA", "DE", "LMT", "MMM", "GD", "NOC", "WM", "ETN", "ITW", "EMR", "FDX", "CSX", "NSC", "AXON"],
-    "Communication Services": ["GOOGL", "NFLX", "DIS", "CMCSA", "VZ", "T", "TMUS", "CHTR", "EA", "WBD", "MTCH", "OMC", "IPG", "FOXA", "LYV"],
-    "Consumer Staples": ["PG", "KO", "PEP", "COST", "WMT", "PM", "MO", "CL", "MDLZ", "GIS", "KHC", "HSY", "K", "SJM", "CAG"],
-    "Energy": ["XOM", "CVX", "COP", "SLB", "EOG", "MPC", "PSX", "VLO", "OXY", "PXD", "HES", "DVN", "HAL", "FANG", "BKR"],
-    "Utilities": ["NEE", "DUK", "SO", "AEP", "D", "SRE", "EXC", "XEL", "WEC", "ED", "ES", "AWK", "DTE", "PPL", "FE"],
-    "Real Estate": ["PLD", "AMT", "CCI", "EQIX", "PSA", "SPG", "O", "VICI", "WELL", "DLR", "AVB", "EQR", "ARE", "MAA", "UDR"],
-    "Materials": ["LIN", "APD", "SHW", "FCX", "NEM", "ECL", "DOW", "NUE", "VMC", "MLM", "PPG", "CF", "ALB", "BALL", "CE"],
-}
+import numpy as np
+
+import analytics
+import artifacts
+import registry
+from fetch_data import aggregate
+
+KST = timezone(timedelta(hours=9))
+OUT_DIR = "sample"
+PE_MAX = analytics.PE_MAX
 
 PE_RANGES = {
-    "Technology": (15, 80),
+    "Information Technology": (15, 80),
     "Financials": (8, 18),
-    "Healthcare": (10, 45),
+    "Health Care": (10, 45),
     "Consumer Discretionary": (12, 90),
     "Industrials": (15, 35),
     "Communication Services": (12, 30),
@@ -36,158 +52,165 @@ PE_RANGES = {
     "Real Estate": (25, 55),
     "Materials": (12, 25),
 }
-
-COMPANY_NAMES = {
-    "AAPL": "Apple Inc.", "MSFT": "Microsoft Corp.", "NVDA": "NVIDIA Corp.",
-    "GOOG": "Alphabet Inc.", "META": "Meta Platforms", "AMZN": "Amazon.com Inc.",
-    "TSLA": "Tesla Inc.", "JPM": "JPMorgan Chase", "V": "Visa Inc.",
-    "UNH": "UnitedHealth Group", "LLY": "Eli Lilly", "JNJ": "Johnson & Johnson",
-    "AVGO": "Broadcom Inc.", "MA": "Mastercard", "PG": "Procter & Gamble",
-    "HD": "Home Depot", "ORCL": "Oracle Corp.", "ABBV": "AbbVie Inc.",
-    "MRK": "Merck & Co.", "CRM": "Salesforce Inc.", "KO": "Coca-Cola",
-    "PEP": "PepsiCo Inc.", "COST": "Costco Wholesale", "WMT": "Walmart Inc.",
-    "BAC": "Bank of America", "AMD": "AMD Inc.", "TMO": "Thermo Fisher",
-    "ADBE": "Adobe Inc.", "MCD": "McDonald's", "NKE": "Nike Inc.",
-    "INTC": "Intel Corp.", "CSCO": "Cisco Systems", "PFE": "Pfizer Inc.",
-    "GM": "General Motors", "F": "Ford Motor Co.", "CVS": "CVS Health",
-    "C": "Citigroup Inc.", "VZ": "Verizon Comm.", "BMY": "Bristol-Myers Squibb",
-    "MU": "Micron Technology", "XOM": "Exxon Mobil", "CVX": "Chevron Corp.",
-    "NEE": "NextEra Energy", "GE": "GE Aerospace", "CAT": "Caterpillar Inc.",
-    "BA": "Boeing Co.", "PLTR": "Palantir Tech.", "NFLX": "Netflix Inc.",
-    "DIS": "Walt Disney", "WFC": "Wells Fargo", "GS": "Goldman Sachs",
-    "T": "AT&T Inc.", "LOW": "Lowe's Companies", "SBUX": "Starbucks Corp.",
-    "BKNG": "Booking Holdings", "LMT": "Lockheed Martin", "RTX": "RTX Corp.",
-    "AXON": "Axon Enterprise", "DG": "Dollar General", "LULU": "Lululemon",
-    "MRNA": "Moderna Inc.", "ENPH": "Enphase Energy",
-}
-
-
-def gen_pe(sector):
-    lo, hi = PE_RANGES.get(sector, (10, 40))
-    return round(random.uniform(lo, hi), 1)
-
-
-def gen_stock(ticker, sector):
-    pe = gen_pe(sector)
-    price = round(random.uniform(20, 600), 2)
-    high52 = round(price * random.uniform(1.0, 1.6), 2)
-    low52 = round(price * random.uniform(0.5, 1.0), 2)
-    discount = round((price - high52) / high52 * 100, 2)
-    
-    # PE percentile (history-based)
-    pe_pct = random.randint(2, 98)
-    # Bias: low PE stocks tend to have low percentile
-    if pe < PE_RANGES.get(sector, (10, 40))[0] * 1.2:
-        pe_pct = random.randint(2, 30)
-    elif pe > PE_RANGES.get(sector, (10, 40))[1] * 0.8:
-        pe_pct = random.randint(70, 98)
-
-    # Value score
-    pe_rank = min(100, max(0, int(pe / 80 * 100)))
-    value_score = max(0, min(100, 100 - pe_rank + random.randint(-15, 15)))
-
-    # Historical performance
-    n_cases = random.randint(2, 5)
-    cases = []
-    returns = []
-    for _ in range(n_cases):
-        year = random.randint(2020, 2024)
-        month = random.randint(1, 12)
-        if pe_pct < 30:  # undervalued tends to go up
-            ret = round(random.gauss(15, 20), 1)
-        elif pe_pct > 70:  # overvalued tends to go down
-            ret = round(random.gauss(-8, 18), 1)
-        else:
-            ret = round(random.gauss(5, 15), 1)
-        returns.append(ret)
-        cases.append({
-            "date": f"{year}-{month:02d}",
-            "pe": round(pe * random.uniform(0.85, 1.15), 1),
-            "return6m": ret,
-        })
-
-    hist = {
-        "similarCount": n_cases,
-        "avg6mReturn": round(sum(returns) / len(returns), 1) if returns else None,
-        "winRate": round(sum(1 for r in returns if r > 0) / len(returns) * 100) if returns else None,
-        "cases": sorted(cases, key=lambda x: x["date"]),
+# Fields --null-rate may blank, besides pe and the price history
+OPTIONAL_FIELDS = ["forwardPE", "pb", "ps", "peg", "evEbitda", "dividendYield", "roe"]
+QUARTER_DRIFT, QUARTER_VOL = 0.02, 0.12   # log-return mean / sd of a quarterly close
+NEW_LISTING_RATE = 0.08                   # share of stocks with a shorter history
+
+
+def universe(size=None):
+    """[(ticker, name, sector)]: the registry's members, then synthetic ones up to ``size``."""
+    members = [(t, name, sector) for t, (name, sector) in registry.load().members().items()]
+    if size is None:
+        return members
+    sectors = list(PE_RANGES)
+    extra = [(f"SYN{i:06d}", f"Synthetic Holdings {i}", sectors[i % len(sectors)])
+             for i in range(1, size - len(members) + 1)]
+    return (members + extra)[:size]
+
+
+def gen_items(stocks, years=5, null_rate=0.0, outlier_rate=0.0, seed=42, now=None):
+    """Fetched-style items (see analytics) for ``stocks`` from universe()."""
+    rng = np.random.default_rng(seed)
+    n = len(stocks)
+    now = now or datetime.now()
+    bounds = np.array([PE_RANGES.get(s[2], (10, 40)) for s in stocks], dtype=float)
+
+    def nulls():
+        return rng.random(n) < null_rate
+
+    def outliers():
+        return rng.random(n) < outlier_rate
+
+    pe = rng.uniform(bounds[:, 0], bounds[:, 1])
+    price = np.round(rng.uniform(20, 600, n), 2)
+    high52 = np.round(price * rng.uniform(1.0, 1.6, n), 2)
+    low52 = np.round(price * rng.uniform(0.5, 1.0, n), 2)
+    values = {
+        "forwardPE": pe * rng.uniform(0.7, 1.1, n),
+        "pb": rng.lognormal(1.0, 0.9, n),
+        "ps": rng.lognormal(1.0, 0.8, n),
+        "peg": rng.uniform(0.1, 5, n),
+        "evEbitda": rng.uniform(5, 40, n),
+        "dividendYield": np.where(rng.random(n) < 0.25, 0.0, rng.uniform(0.2, 6, n)),
+        "roe": rng.normal(18, 15, n),
     }
-
-    mcap_base = random.uniform(5, 3000)
-
-    return {
-        "ticker": ticker,
-        "name": COMPANY_NAMES.get(ticker, f"{ticker} Corp."),
-        "sector": sector,
-        "industry": "",
-        "price": price,
-        "marketCap": round(mcap_base * 1e9),
-        "pe": pe,
-        "forwardPE": round(pe * random.uniform(0.7, 1.1), 1),
-        "pb": round(random.uniform(0.5, 50), 1),
-        "ps": round(random.uniform(0.2, 20), 1),
-        "peg": round(random.uniform(0.1, 5), 2),
-        "evEbitda": round(random.uniform(5, 40), 1),
-        "dividendYield": round(random.uniform(0, 5), 2),
-        "roe": round(random.uniform(-5, 50), 1),
-        "high52w": high52,
-        "low52w": low52,
-        "discount52w": discount,
-        "valueScore": value_score,
-        "pePercentile": pe_pct,
-        "peRank": pe_rank,
-        "histPerformance": hist,
-    }
-
-
-def main():
-    stocks = []
-    sector_data = {}
-
-    for sector, tickers in SECTORS.items():
-        pe_vals = []
-        pb_vals = []
-        for ticker in tickers:
-            stock = gen_stock(ticker, sector)
-            stocks.append(stock)
-            if stock["pe"]:
-                pe_vals.append(stock["pe"])
-            if stock["pb"]:
-                pb_vals.append(stock["pb"])
-
-        sector_data[sector] = {
-            "avgPE": round(sum(pe_vals) / len(pe_vals), 1) if pe_vals else None,
-            "avgPB": round(sum(pb_vals) / len(pb_vals), 1) if pb_vals else None,
-            "count": len(tickers),
+    mcap = np.round(rng.lognormal(23.5, 1.3, n))
+
+    huge = outliers()
+    pe[huge] = rng.uniform(PE_MAX, 5000, huge.sum())
+    negative = outliers()
+    pe[negative] = -rng.uniform(1, 50, negative.sum())
+    for field, make in [("pb", lambda k: rng.uniform(200, 2000, k)),
+                        ("ps", lambda k: rng.uniform(50, 500, k)),
+                        ("peg", lambda k: -rng.uniform(0.1, 5, k)),
+                        ("evEbitda", lambda k: rng.uniform(200, 3000, k))]:
+        mask = outliers()
+        values[field][mask] = make(mask.sum())
+    pe[nulls()] = np.nan
+    for field in OPTIONAL_FIELDS:
+        values[field][nulls()] = np.nan
+
+    # Quarterly closes: a random walk backwards from today's price
+    bars = years * 4 + 1
+    steps = rng.normal(QUARTER_DRIFT, QUARTER_VOL, (n, bars - 1))
+    log_path = np.hstack([-np.cumsum(steps[:, ::-1], axis=1)[:, ::-1], np.zeros((n, 1))])
+    closes = np.round(price[:, None] * np.exp(log_path), 2).tolist()
+    first = np.where(rng.random(n) < NEW_LISTING_RATE, rng.integers(1, bars - 1, n), 0)
+    first[nulls()] = bars
+    current = (now.year * 12 + now.month - 1) // analytics.BAR_MONTHS * analytics.BAR_MONTHS
+    months = [analytics.month_label(current - analytics.BAR_MONTHS * (bars - 1 - j)) for j in range(bars)]
+
+    def num(a, digits=2):
+        return [None if np.isnan(v) else round(v, digits) for v in a.tolist()]
+
+    pe_list, pe_rounded = num(pe, 15), num(pe)
+    cols = {field: num(a) for field, a in values.items()}
+    raw = {field: num(values[field], 15) for field in ["forwardPE", "pb", "ps", "peg"]}
+    discount = np.round((price - high52) / high52 * 100, 2).tolist()
+    price, high52, low52, mcap, first = (a.tolist() for a in (price, high52, low52, mcap, first))
+
+    items = []
+    for i, (ticker, name, sector) in enumerate(stocks):
+        p = pe_rounded[i]
+        record = {
+            "ticker": ticker,
+            "name": name,
+            "sector": sector,
+            "price": price[i],
+            "marketCap": int(mcap[i]),
+            "pe": p,
+            **{field: cols[field][i] for field in OPTIONAL_FIELDS},
+            "high52w": high52[i],
+            "low52w": low52[i],
+            "discount52w": discount[i],
+            "valueScore": None,
+            "pePercentile": None,
+            "peRank": round(p / 50 * 100) if p else None,
+            "peHistory": [],
+            "histPerformance": None,
         }
+        inputs = {"price": price[i], "pe": pe_list[i], **{k: v[i] for k, v in raw.items()}}
+        start = first[i]
+        items.append({"record": record, "inputs": inputs,
+                      "history": {"months": months[start:], "close": closes[i][start:]}})
+    return items
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sample dashboard data.")
+    parser.add_argument("--size", type=int,
+                        help="number of stocks; beyond the registry's members synthetic tickers "
+                             "are added (default: the registry's members)")
+    parser.add_argument("--years", type=int, default=5, help="years of quarterly P/E history (default 5)")
+    parser.add_argument("--null-rate", type=float, default=0.0,
+                        help="probability that each optional field is missing (default 0)")
+    parser.add_argument("--outlier-rate", type=float, default=0.0,
+                        help="probability that each multiple is an extreme or negative value (default 0)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=OUT_DIR,
+                        help=f"directory for the data file and dashboard artifacts (default {OUT_DIR}/)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="write the dashboard index as struct-of-arrays columns")
+    args = parser.parse_args(argv)
+    if args.size is not None and args.size < 1:
+        parser.error("--size must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t = time.perf_counter()
+    items = gen_items(universe(args.size), args.years, args.null_rate, args.outlier_rate, args.seed)
+    generated = time.perf_counter() - t
+    timings = {}
+    stocks = analytics.build_records(items, timings=timings)
+    del items
+    sector_data, summary = aggregate(stocks)
 
     # Sort by PE
     stocks.sort(key=lambda x: x.get("pe") or 9999)
-
-    valid_pe = [s["pe"] for s in stocks if s["pe"]]
-    summary = {
-        "totalStocks": len(stocks),
-        "avgPE": round(sum(valid_pe) / len(valid_pe), 1),
-        "undervalued": sum(1 for s in stocks if s["valueScore"] >= 65),
-        "overvalued": sum(1 for s in stocks if s["valueScore"] <= 35),
-        "fairValue": sum(1 for s in stocks if 35 < s["valueScore"] < 65),
-    }
-
     output = {
-        "lastUpdated": "2025.02.08 07:00 KST",
+        "lastUpdated": datetime.now(KST).strftime("%Y.%m.%d %H:%M KST"),
         "summary": summary,
         "stocks": stocks,
         "sectors": sector_data,
     }
 
-    os.makedirs("data", exist_ok=True)
-    with open("data/sp500_data.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    t = time.perf_counter()
+    path = os.path.join(args.out, artifacts.DATA_NAME)
+    os.makedirs(args.out, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(output, ensure_ascii=False))
+    artifacts.write_split(output, args.out, columnar=args.columnar, deltas=False)
+    written = time.perf_counter() - t
 
-    print(f"✅ Sample data generated: {len(stocks)} stocks")
+    print(f"✅ Sample data generated: {len(stocks)} stocks in {path}")
     print(f"   Undervalued: {summary['undervalued']}")
     print(f"   Overvalued: {summary['overvalued']}")
     print(f"   Fair Value: {summary['fairValue']}")
+    print(f"⏱️  generate {generated:.2f}s, analytics {sum(timings.values()):.2f}s "
+          f"({', '.join(f'{k} {v:.2f}s' for k, v in timings.items())}), write {written:.2f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Index constituents registry.
+
+Each universe is a CSV file in universes/ (sp500.csv, and any other index
+dropped in next to it: sp400.csv, nasdaq100.csv, ...), one row per
+membership spell:
+
+    ticker,name,sector,subIndustry,added,removed
+
+``added``/``removed`` are ISO dates; blank means "since before the
+records start" / "still a member", and a ticker that left and rejoined has
+one row per spell. A file is read on first use and indexed by ticker,
+sector and GICS sub-industry. Row order is kept because the pipeline's
+output order follows it. Dates are parsed and normalized as the file is
+read; a malformed one, or a spell that ends before it starts, raises
+ValueError naming the file and line.
+
+Run: python registry.py [sp500] [--as-of 2020-06-30] [--sector Energy]
+"""
+import argparse, csv, os, sys
+from datetime import date, datetime
+from functools import lru_cache
+
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+DEFAULT_UNIVERSE = "sp500"
+COLUMNS = ["ticker", "name", "sector", "subIndustry", "added", "removed"]
+
+
+def _iso(day):
+    """None (today) / date / 'YYYY-MM-DD' -> 'YYYY-MM-DD'.
+
+    Strings are parsed and re-emitted, so '2024-3-5' compares correctly
+    against the CSV's dates; anything that is not a date raises ValueError.
+    """
+    if day is None:
+        day = date.today()
+    elif isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+    return day.isoformat()
+
+
+def iso_date(text):
+    """argparse type for --as-of: 'YYYY-MM-DD' -> date."""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date such as 2020-06-30, got {text!r}") from None
+
+
+def _active(row, day):
+    return (not row["added"] or row["added"] <= day) and (not row["removed"] or day < row["removed"])
+
+
+class Universe:
+    """Membership rows of one universe, indexed by ticker, sector and sub-industry."""
+
+    def __init__(self, name, rows):
+        self.name, self.rows = name, rows
+        self.by_ticker, self.by_sector, self.by_sub_industry = {}, {}, {}
+        for row in rows:
+            self.by_ticker.setdefault(row["ticker"], []).append(row)
+            self.by_sector.setdefault(row["sector"], []).append(row)
+            if row["subIndustry"]:
+                self.by_sub_industry.setdefault(row["subIndustry"], []).append(row)
+
+    def __len__(self):
+        return len(self.by_ticker)
+
+    @staticmethod
+    def _select(rows, on):
+        day = _iso(on)
+        return {r["ticker"]: (r["name"], r["sector"]) for r in rows if _active(r, day)}
+
+    def members(self, on=None):
+        """{ticker: (name, sector)} of the members on ``on`` (default: today), in file order."""
+        return self._select(self.rows, on)
+
+    def sector(self, sector, on=None):
+        return self._select(self.by_sector.get(sector, []), on)
+
+    def sub_industry(self, sub_industry, on=None):
+        return self._select(self.by_sub_industry.get(sub_industry, []), on)
+
+    def get(self, ticker):
+        """The ticker's latest row, or None."""
+        spells = self.by_ticker.get(ticker)
+        return spells[-1] if spells else None
+
+    def sectors(self):
+        return sorted(self.by_sector)
+
+
+def available():
+    """Names of the universes in UNIVERSE_DIR."""
+    return sorted(f[:-4] for f in os.listdir(UNIVERSE_DIR) if f.endswith(".csv"))
+
+
+@lru_cache(maxsize=None)
+def load(name=DEFAULT_UNIVERSE):
+    """A universe by name (universes/<name>.csv) or by path to a CSV file."""
+    path = name if name.endswith(".csv") else os.path.join(UNIVERSE_DIR, f"{name}.csv")
+    if not os.path.exists(path):
+        raise ValueError(f"unknown universe {name!r} (available: {', '.join(available())})")
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = set(COLUMNS) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{path} lacks columns {sorted(missing)}")
+        rows = []
+        for row in reader:
+            row = {k: (row[k] or "").strip() for k in COLUMNS}
+            for k in ("added", "removed"):
+                if row[k]:
+                    try:
+                        row[k] = _iso(row[k])
+                    except ValueError:
+                        raise ValueError(f"{path} line {reader.line_num}: {k} {row[k]!r} "
+                                         f"is not a YYYY-MM-DD date") from None
+            if row["added"] and row["removed"] and row["removed"] <= row["added"]:
+                raise ValueError(f"{path} line {reader.line_num}: removed {row['removed']} "
+                                 f"is not after added {row['added']}")
+            rows.append(row)
+    return Universe(os.path.splitext(os.path.basename(path))[0], rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List index constituents.")
+    parser.add_argument("universe", nargs="?", default=DEFAULT_UNIVERSE,
+                        help=f"universe name or CSV path (available: {', '.join(available())})")
+    parser.add_argument("--as-of", type=iso_date, help="membership on this date, YYYY-MM-DD (default today)")
+    parser.add_argument("--sector", help="only this GICS sector")
+    parser.add_argument("--sub-industry", help="only this GICS sub-industry")
+    args = parser.parse_args(argv)
+
+    try:
+        universe = load(args.universe)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    if args.sector:
+        members = universe.sector(args.sector, args.as_of)
+    elif args.sub_industry:
+        members = universe.sub_industry(args.sub_industry, args.as_of)
+    else:
+        members = universe.members(args.as_of)
+    for ticker, (name, sector) in members.items():
+        print(f"{ticker:<8}{sector:<26}{name}")
+    print(f"\n{len(members)} of {len(universe)} tickers in {universe.name} on {_iso(args.as_of)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Retry policies and a circuit breaker for yfinance calls.
+
+Every upstream request goes through Retry.call, which sorts failures into
+classes and retries each class under its own policy with full-jitter
+exponential backoff:
+
+    throttle   HTTP 429 / YFRateLimitError   retried patiently; also slows the
+                                             shared TokenBucket and counts
+                                             towards the circuit breaker
+    transient  timeouts, dropped connections, 5xx, truncated JSON
+    fatal      anything else (404, delisted, malformed data): not retried
+
+When throttling errors pile up across the pool the CircuitBreaker opens
+and every worker waits out a cooldown before sending anything else.
+Callers decide what an exhausted retriable failure means; fetch_data
+queues the ticker for a second pass at the end of the run.
+"""
+import random, re, threading, time
+from collections import deque, namedtuple
+
+Policy = namedtuple("Policy", "attempts base cap")   # retries, first delay (s), max delay (s)
+
+POLICIES = {
+    "throttle": Policy(attempts=4, base=2.0, cap=60.0),
+    "transient": Policy(attempts=3, base=0.5, cap=8.0),
+    "fatal": Policy(attempts=0, base=0.0, cap=0.0),
+}
+BREAKER_THRESHOLD = 5      # throttling errors within BREAKER_WINDOW that open the breaker
+BREAKER_WINDOW = 30.0      # seconds
+BREAKER_COOLDOWN = 30.0    # seconds the pool pauses once open; doubles on a failed trial
+BREAKER_MAX_COOLDOWN = 300.0
+
+THROTTLE_TEXT = re.compile(r"RateLimit|Too Many Requests|\b429\b")
+TRANSIENT_NAMES = {"TimeoutError", "Timeout", "ReadTimeout", "ConnectTimeout", "ConnectionError",
+                   "ChunkedEncodingError", "ProtocolError", "RemoteDisconnected", "IncompleteRead",
+                   "SSLError", "JSONDecodeError", "CurlError"}
+TRANSIENT_TEXT = re.compile(r"\b50[0234]\b|timed out|[Cc]onnection (?:reset|aborted|refused)|"
+                            r"[Tt]emporarily unavailable|Expecting value")
+
+
+def classify(exc):
+    """'throttle', 'transient' or 'fatal' for an exception raised by a request."""
+    text = f"{type(exc).__name__} {exc}"
+    if THROTTLE_TEXT.search(text):
+        return "throttle"
+    if {c.__name__ for c in type(exc).__mro__} & TRANSIENT_NAMES or TRANSIENT_TEXT.search(text):
+        return "transient"
+    return "fatal"
+
+
+def is_throttled(exc):
+    """True if an exception looks like Yahoo rate limiting (HTTP 429)."""
+    return classify(exc) == "throttle"
+
+
+def backoff(policy, attempt, rng=random):
+    """Full-jitter delay before retry number ``attempt`` (1-based)."""
+    return rng.uniform(0, min(policy.cap, policy.base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Pauses every worker while the upstream is clearly throttling.
+
+    ``threshold`` throttling errors within ``window`` seconds open the
+    breaker for a cooldown. The first request after it is a trial: if that
+    is throttled too the breaker re-opens with twice the cooldown (up to
+    ``max_cooldown``); a success closes it and resets the cooldown.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, window=BREAKER_WINDOW, cooldown=BREAKER_COOLDOWN,
+                 max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold, self.window = threshold, window
+        self.base_cooldown = self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = deque()
+        self.open_until = 0.0
+        self.trial = False
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block while the breaker is open."""
+        while True:
+            with self.lock:
+                remaining = self.open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def failure(self):
+        """Count a throttling error."""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.open_until:
+                return   # a request that was already in flight when it opened
+            if self.trial:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open(now)
+                return
+            self.failures.append(now)
+            while self.failures[0] < now - self.window:
+                self.failures.popleft()
+            if len(self.failures) >= self.threshold:
+                self._open(now)
+
+    def success(self):
+        with self.lock:
+            if self.trial and time.monotonic() >= self.open_until:
+                self.trial = False
+                self.cooldown = self.base_cooldown
+
+    def _open(self, now):
+        self.open_until = now + self.cooldown
+        self.failures.clear()
+        self.trial = True
+        self.trips += 1
+        print(f"  🔌 Upstream is throttling: pausing all workers for {self.cooldown:.0f}s", flush=True)
+
+
+class Retry:
+    """Runs requests under POLICIES, shared by every worker of a run.
+
+    ``limiter`` (a TokenBucket) is slowed on each throttling error and
+    ``breaker`` is consulted before every attempt.
+    """
+
+    def __init__(self, limiter=None, breaker=None, policies=POLICIES):
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.policies = policies
+
+    def retriable(self, exc):
+        """True if ``exc`` is worth trying again later (a second pass)."""
+        return self.policies[classify(exc)].attempts > 0
+
+    def call(self, request, event=None):
+        """Return ``request()``, retrying failures by class.
+
+        ``event`` (a telemetry event) gets the retry count and the class
+        name of the last error. The final error is re-raised.
+        """
+        tries = {}
+        while True:
+            self.breaker.wait()
+            try:
+                result = request()
+            except Exception as e:
+                kind = classify(e)
+                tries[kind] = tries.get(kind, 0) + 1
+                if event is not None:
+                    event["error"] = type(e).__name__
+                if kind == "throttle":
+                    if self.limiter:
+                        self.limiter.throttled()
+                    self.breaker.failure()
+                policy = self.policies[kind]
+                if tries[kind] > policy.attempts:
+                    raise
+                if event is not None:
+                    event["retries"] = event.get("retries", 0) + 1
+                time.sleep(backoff(policy, tries[kind]))
+                continue
+            if event is not None:
+                event["error"] = None
+            self.breaker.success()
+            return result
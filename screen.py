@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Query the screener store from the command line.
+
+Filters are plain comparisons over stock fields, combined with and/or/not;
+"sector avgPE" (or sector.avgPE) is the stock's sector average on the same
+date. Only known field names are accepted, and values are bound as
+parameters, so an expression can never reach the database as raw SQL.
+Malformed filters (a missing or extra operand, unbalanced parentheses) are
+refused by the compiler as well, before SQLite sees them.
+
+Run: python screen.py "pe < sector avgPE and discount52w < -20" --sort valueScore --desc
+     python screen.py "valueScore >= 70" --since 2026-01-01 --columns ticker,pe,valueScore
+"""
+import argparse, json, os, re, sqlite3, sys, time
+from contextlib import closing
+
+import store
+
+TOKEN = re.compile(r"""\s*(?:
+    (?P<num>\d+(?:\.\d*)?|\.\d+)
+  | (?P<str>'[^']*'|"[^"]*")
+  | (?P<op><=|>=|!=|<>|==|[<>=()+\-*/,])
+  | (?P<name>[A-Za-z_][\w]*(?:\.[A-Za-z_]\w*)?)
+)""", re.X)
+KEYWORDS = {"and", "or", "not", "is", "null", "like", "in", "between"}
+BINARY_OPS = {"<", "<=", ">", ">=", "=", "==", "!=", "<>", "*", "/"}   # need an operand on both sides
+STOCK_FIELDS = store.TEXT_FIELDS + store.NUM_FIELDS
+DEFAULT_COLUMNS = ["ticker", "name", "sector", "pe", "pb", "discount52w", "valueScore", "pePercentile"]
+
+
+def _field(name):
+    if name in STOCK_FIELDS:
+        return f's."{name}"'
+    raise ValueError(f"unknown field {name!r} (choose from {', '.join(STOCK_FIELDS)})")
+
+
+def _operand(token, left):
+    """Whether ``token`` can end (``left``) or start the operand of a binary operator."""
+    if token is None:
+        return False
+    kind, text, _ = token
+    if kind in ("num", "str"):
+        return True
+    if kind == "name":
+        return text.lower() not in KEYWORDS or text.lower() == "null"
+    return text == (")" if left else "(") or (not left and text in ("-", "+"))
+
+
+def _unparsed(expr, start):
+    return ValueError(f"cannot parse {expr[start:].rstrip()!r}")
+
+
+def compile_where(expr):
+    """Filter expression -> (SQL fragment, parameters). Raises ValueError on anything unknown."""
+    tokens, pos = [], 0
+    while pos < len(expr):
+        m = TOKEN.match(expr, pos)
+        if not m or m.end() == pos:
+            if expr[pos:].strip():
+                raise ValueError(f"cannot parse {expr[pos:]!r}")
+            break
+        tokens.append((m.lastgroup, m.group(m.lastgroup), m.start(m.lastgroup)))
+        pos = m.end()
+
+    sql, params, i = [], [], 0
+    opened = []      # start of each "(" not closed yet
+    ended = False    # the SQL so far ends in an operand, so another one cannot follow ("pe 10")
+    while i < len(tokens):
+        kind, text, start = tokens[i]
+        starts = kind in ("num", "str") or text == "(" or (kind == "name" and (
+            text.lower() == "null" or text.lower() not in KEYWORDS))
+        if starts and ended:
+            raise _unparsed(expr, start)
+        ended = starts and text != "("
+        if kind == "num":
+            sql.append("?")
+            params.append(float(text))
+        elif kind == "str":
+            sql.append("?")
+            params.append(text[1:-1])
+        elif kind == "op":
+            # "pe <" would otherwise reach SQLite and come back as its syntax error
+            if text in BINARY_OPS and not (_operand(tokens[i - 1] if i else None, True)
+                                            and _operand(tokens[i + 1] if i + 1 < len(tokens) else None, False)):
+                raise _unparsed(expr, start)
+            if text == "(":
+                opened.append(start)
+            elif text == ")":
+                if not opened:
+                    raise _unparsed(expr, start)
+                opened.pop()
+                ended = True
+            sql.append("=" if text == "==" else text)
+        elif text.lower() in KEYWORDS:
+            if text.lower() in ("and", "or", "not") and i + 1 == len(tokens):
+                raise _unparsed(expr, start)
+            sql.append(text.upper())
+        elif text.startswith("sector.") or (text == "sector" and i + 1 < len(tokens)
+                                            and tokens[i + 1][1] in store.SECTOR_FIELDS):
+            if text == "sector":
+                i += 1
+                text = "sector." + tokens[i][1]
+            agg = text.split(".", 1)[1]
+            if agg not in store.SECTOR_FIELDS:
+                raise ValueError(f"unknown sector field {agg!r} (choose from {', '.join(store.SECTOR_FIELDS)})")
+            sql.append(f"g.{agg}")
+        else:
+            sql.append(_field(text))
+        i += 1
+    if opened:
+        raise _unparsed(expr, opened[-1])
+    return " ".join(sql), params
+
+
+def query(db, where=None, sector=None, search=None, sort="valueScore", desc=False, limit=50,
+          columns=DEFAULT_COLUMNS, date=None, since=None, until=None):
+    """Run a screen; returns a list of dicts. Defaults to the latest stored date."""
+    clauses, params = [], []
+    if since or until:
+        if since:
+            clauses.append("s.date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("s.date <= ?")
+            params.append(until)
+    else:
+        clauses.append("s.date = " + ("?" if date else "(SELECT MAX(date) FROM stocks)"))
+        params += [date] if date else []
+    if sector:
+        clauses.append("s.sector = ?")
+        params.append(sector)
+    if search:
+        clauses.append("(s.ticker LIKE ? OR s.name LIKE ?)")
+        params += [f"%{search}%"] * 2
+    if where:
+        sql, extra = compile_where(where)
+        clauses.append(f"({sql})")
+        params += extra
+
+    select = ", ".join(["s.date"] + [_field(c) for c in columns if c != "date"])
+    order = f"{_field(sort)} IS NULL, {_field(sort)} {'DESC' if desc else 'ASC'}, s.date, s.ticker"
+    sql = (f"SELECT {select} FROM stocks s LEFT JOIN sectors g ON g.date = s.date AND g.sector = s.sector "
+           f"WHERE {' AND '.join(clauses)} ORDER BY {order}")
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return [dict(r) for r in db.execute(sql, params)]
+
+
+def _cell(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.0f}" if value.is_integer() or abs(value) >= 1e6 else f"{value:,.2f}"
+    return str(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Screen stocks stored by fetch_data.py.")
+    parser.add_argument("where", nargs="?", help='filter, e.g. "pe < sector avgPE and discount52w < -20"')
+    parser.add_argument("--sector", help="only this sector")
+    parser.add_argument("--search", help="ticker or name contains")
+    parser.add_argument("--sort", default="valueScore", choices=STOCK_FIELDS)
+    parser.add_argument("--desc", action="store_true", help="sort descending")
+    parser.add_argument("--limit", type=int, default=50, help="max rows (0 = all)")
+    parser.add_argument("--columns", default=",".join(DEFAULT_COLUMNS), help="comma-separated fields to show")
+    parser.add_argument("--date", help="snapshot date YYYY-MM-DD (default: latest)")
+    parser.add_argument("--since", help="screen every snapshot from this date on")
+    parser.add_argument("--until", help="screen every snapshot up to this date")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--db", default=store.DB_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"🗄️  Building {args.db} from {store.DATA_PATH} and the snapshot history...", file=sys.stderr)
+        store.rebuild(args.db)
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+    multi = bool(args.since or args.until)
+
+    t = time.perf_counter()
+    with closing(store.connect(args.db)) as db:
+        try:
+            rows = query(db, args.where, args.sector, args.search, args.sort, args.desc, args.limit,
+                         columns, args.date, args.since, args.until)
+        except (ValueError, sqlite3.OperationalError) as e:
+            sys.exit(f"❌ {e}")
+    ms = (time.perf_counter() - t) * 1000
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    shown = (["date"] if multi else []) + [c for c in columns if c != "date"]
+    cells = [[_cell(r[c]) for c in shown] for r in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(shown)]
+    print("  ".join(c.ljust(w) for c, w in zip(shown, widths)))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+    date = "" if multi or not rows else f" on {rows[0]['date']}"
+    print(f"\n{len(rows)} stocks{date} ({ms:.1f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
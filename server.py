@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Local HTTP API for screening queries.
+
+Serves the dashboard (index.html and data/) plus JSON query endpoints over
+the latest data file, so the ranking table only transfers the rows on
+screen (open the dashboard with ?api=/api/):
+
+    GET /api/meta                 lastUpdated, summary, sectors, total
+    GET /api/stocks               ?sector= &search= &sort=pe &dir=asc|desc
+                                  &offset=0 &limit=50 &min_<field>= &max_<field>=
+                                  &has=<field>,...  (only rows where these are set)
+    GET /api/stocks/<TICKER>      the full record, peHistory included
+    GET /api/sectors              per-sector aggregates
+    GET /api/details/<sector>     a sector's detail shard (as data/details/)
+
+Filtering and ordering follow the dashboard's getFS (nulls sort as 9999,
+ties keep file order). Every API response carries an ETag made of the data
+file's content hash and the normalized query, so If-None-Match is answered
+with a 304 before anything is computed; bodies are kept in an in-process
+LRU under the same key and fall out of use as soon as the file changes.
+Standard library only: asyncio handles the connections, and reloading the
+file, running a query, encoding and compressing its body and reading static
+files happen on the loop's default thread pool so one slow request never
+stalls the others.
+
+Run: python server.py [--port 8000]   then open http://localhost:8000/?api=/api/
+"""
+import argparse, asyncio, gzip, hashlib, json, math, mimetypes, os, time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import artifacts
+
+HOST = "127.0.0.1"
+PORT = 8000
+ROOT = "."                # served directory, like every other path here
+DATA_PATH = os.path.join(artifacts.DATA_DIR, artifacts.DATA_NAME)
+# Served files: the dashboard and what artifacts.py publishes for it (hashed names included).
+# Everything else in the repo stays private, data/screener.db and the fetch state among it
+STATIC = ["index.html"] + [f"{artifacts.DATA_DIR}/{name}" for name in (
+    artifacts.MANIFEST_NAME, artifacts.DATA_NAME, artifacts.INDEX_NAME, artifacts.SORTED_NAME)]
+STATIC_DIRS = [f"{artifacts.DATA_DIR}/{name}/" for name in (artifacts.DETAILS_NAME, artifacts.DELTAS_NAME)]
+CACHE_SIZE = 256          # cached API responses
+PAGE_LIMIT = 500          # max rows per /api/stocks page
+GZIP_MIN = 1024           # smaller bodies are sent uncompressed
+IDLE_TIMEOUT = 15         # seconds a keep-alive connection may sit idle
+MISSING = 9999            # sort key for nulls, as the dashboard's getFS
+IMMUTABLE = "public, max-age=31536000, immutable"
+NUMERIC = [f for f in artifacts.INDEX_FIELDS if f not in ("ticker", "name", "sector", "histPerformance")]
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRU:
+    """Least-recently-used map with hit/miss counters."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size, self.items = size, OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        if key not in self.items:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+
+class Dataset:
+    """One load of the data file.
+
+    refresh() returns a new Dataset once the file changed on disk, so a
+    query still running on a worker thread keeps the version it started on.
+    """
+
+    def __init__(self, path=DATA_PATH):
+        self.path, self.stat, self.version = path, None, None
+
+    def refresh(self):
+        st = os.stat(self.path)
+        if (st.st_mtime_ns, st.st_size) == self.stat:
+            return self
+        ds = Dataset(self.path)
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        ds.data = json.loads(raw)
+        ds.version = hashlib.sha256(raw).hexdigest()[:artifacts.HASH_LEN]
+        ds.stocks = ds.data["stocks"]
+        ds.by_ticker = {s["ticker"]: s for s in ds.stocks}
+        ds.slim = [artifacts.split_stock(s)[0] for s in ds.stocks]
+        ds.stat = (st.st_mtime_ns, st.st_size)
+        return ds
+
+
+# ─── Queries ───
+def _number(params, key, default, cast=int):
+    try:
+        value = cast(params.get(key, default))
+    except ValueError:
+        value = None
+    # float() takes "nan" and "inf", which would quietly match every row or none
+    if value is None or not math.isfinite(value):
+        raise HTTPError(400, f"{key} must be a number")
+    return value
+
+
+def query_stocks(ds, params):
+    sort = params.get("sort", "pe")
+    if sort not in NUMERIC:
+        raise HTTPError(400, f"sort must be one of {', '.join(NUMERIC)}")
+    desc = params.get("dir", "asc") == "desc"
+    offset = max(_number(params, "offset", 0), 0)
+    limit = min(max(_number(params, "limit", 50), 0), PAGE_LIMIT)
+    sector, search = params.get("sector"), params.get("search", "").upper()
+    has = [f for f in params.get("has", "").split(",") if f]
+    for field in has:
+        if field not in NUMERIC:
+            raise HTTPError(400, f"cannot filter on {field}")
+    bounds = []
+    for key in params:
+        side, _, field = key.partition("_")
+        if side in ("min", "max") and field:
+            if field not in NUMERIC:
+                raise HTTPError(400, f"cannot filter on {field}")
+            bounds.append((field, side == "min", _number(params, key, 0, float)))
+
+    rows = []
+    for s in ds.slim:
+        if sector and s["sector"] != sector:
+            continue
+        if search and not (search in s["ticker"] or search in (s["name"] or "").upper()):
+            continue
+        if any(s[f] is None for f in has):
+            continue
+        if any(s[f] is None or (s[f] < v if lo else s[f] > v) for f, lo, v in bounds):
+            continue
+        rows.append(s)
+    # sorted() is stable with reverse=True too, so ties keep file order like getFS
+    rows.sort(key=lambda s: MISSING if s[sort] is None else s[sort], reverse=desc)
+    return {"total": len(rows), "offset": offset, "stocks": rows[offset:offset + limit]}
+
+
+def sector_stats(ds):
+    out = {sec: dict(agg) for sec, agg in ds.data["sectors"].items()}
+    scores = {}
+    for s in ds.stocks:
+        if s.get("valueScore") is not None:
+            scores.setdefault(s["sector"], []).append(s["valueScore"])
+    for sec, agg in out.items():
+        vals = scores.get(sec, [])
+        agg["avgScore"] = round(sum(vals) / len(vals), 1) if vals else None
+        # same bands as the dashboard summary
+        agg["undervalued"] = sum(1 for v in vals if v >= 65)
+        agg["overvalued"] = sum(1 for v in vals if v <= 35)
+        agg["fairValue"] = sum(1 for v in vals if 35 < v < 65)
+    return out
+
+
+def route(ds, path, params):
+    """API path (after /api/) -> response object."""
+    parts = [unquote(p) for p in path.split("/")]
+    if parts == ["meta"]:
+        meta = {k: v for k, v in ds.data.items() if k != "stocks"}
+        return dict(meta, total=len(ds.stocks), version=ds.version)
+    if parts == ["stocks"]:
+        return query_stocks(ds, params)
+    if len(parts) == 2 and parts[0] == "stocks":
+        stock = ds.by_ticker.get(parts[1].upper())
+        if stock is None:
+            raise HTTPError(404, f"unknown ticker {parts[1]}")
+        return stock
+    if parts == ["sectors"]:
+        return sector_stats(ds)
+    if len(parts) == 2 and parts[0] == "details":
+        shard = {s["ticker"]: artifacts.split_stock(s)[1] for s in ds.stocks if (s.get("sector") or "") == parts[1]}
+        if not shard:
+            raise HTTPError(404, f"unknown sector {parts[1]}")
+        return shard
+    raise HTTPError(404, f"no endpoint /api/{path}")
+
+
+def render(ds, path, params):
+    """Cache entry for an API path: the JSON body, plus its gzip when that is worth sending."""
+    body = json.dumps(route(ds, path, params), ensure_ascii=False, separators=artifacts.COMPACT).encode()
+    entry = {"body": body}
+    if len(body) >= GZIP_MIN:
+        entry["gzip"] = gzip.compress(body, 6, mtime=0)
+    return entry
+
+
+# ─── HTTP ───
+def published(rel):
+    """Whether the repo-relative path ``rel`` is one of the STATIC files or inside STATIC_DIRS."""
+    plain = artifacts.HASHED.sub(".json", rel)   # sp500_index.<hash>.json(.gz) -> sp500_index.json
+    if plain in STATIC:
+        return True
+    return any(rel.startswith(d) and "/" not in rel[len(d):] and plain.endswith(".json") for d in STATIC_DIRS)
+
+
+class Server:
+    def __init__(self, data_path=DATA_PATH, root=ROOT, cache_size=CACHE_SIZE, quiet=False):
+        self.ds = Dataset(data_path)
+        self.root, self.cache, self.quiet = root, LRU(cache_size), quiet
+
+    async def api(self, path, params, headers):
+        loop = asyncio.get_running_loop()
+        self.ds = ds = await loop.run_in_executor(None, self.ds.refresh)
+        key = (ds.version, path, tuple(sorted(params.items())))
+        etag = '"%s-%s"' % (ds.version, hashlib.sha1(repr(key[1:]).encode()).hexdigest()[:10])
+        out = {"Content-Type": "application/json; charset=utf-8", "ETag": etag,
+               "Cache-Control": "no-cache", "Access-Control-Allow-Origin": "*", "Vary": "Accept-Encoding"}
+        if etag in headers.get("if-none-match", ""):
+            return 304, out, b""
+        entry = self.cache.get(key)
+        out["X-Cache"] = "hit" if entry else "miss"
+        if entry is None:
+            entry = await loop.run_in_executor(None, render, ds, path, params)
+            self.cache.put(key, entry)
+        body = entry["body"]
+        if "gzip" in entry and "gzip" in headers.get("accept-encoding", ""):
+            body, out["Content-Encoding"] = entry["gzip"], "gzip"
+        return 200, out, body
+
+    def static(self, path, headers):
+        rel = path.lstrip("/") or "index.html"
+        full = os.path.normpath(os.path.join(self.root, rel))
+        rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+        if not published(rel) or not os.path.isfile(full):
+            raise HTTPError(404, f"no file /{rel}")
+        st = os.stat(full)
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        out = {"Content-Type": mimetypes.guess_type(full)[0] or "application/octet-stream", "ETag": etag,
+               "Cache-Control": IMMUTABLE if artifacts.HASHED.search(rel) else "no-cache"}
+        if etag in headers.get("if-none-match", ""):
+            return 304, out, b""
+        if "gzip" in headers.get("accept-encoding", "") and os.path.isfile(full + ".gz"):
+            full, out["Content-Encoding"], out["Vary"] = full + ".gz", "gzip", "Accept-Encoding"
+        with open(full, "rb") as f:
+            return 200, out, f.read()
+
+    async def respond(self, method, target, headers):
+        url = urlsplit(target)
+        try:
+            if method not in ("GET", "HEAD"):
+                raise HTTPError(405, "only GET and HEAD are supported")
+            if url.path.startswith("/api/"):
+                return await self.api(url.path[len("/api/"):].strip("/"), dict(parse_qsl(url.query)), headers)
+            return await asyncio.get_running_loop().run_in_executor(None, self.static, unquote(url.path), headers)
+        except HTTPError as e:
+            body = json.dumps({"error": str(e)}).encode()
+            return e.status, {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"}, body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                request = lines[0].split(" ")
+                if len(request) != 3:
+                    break
+                method, target, version = request
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                t = time.perf_counter()
+                status, out, body = await self.respond(method, target, headers)
+                keep = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                        and "content-length" not in headers)
+                out["Content-Length"] = str(len(body))
+                out["Connection"] = "keep-alive" if keep else "close"
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n".encode()
+                             + "".join(f"{k}: {v}\r\n" for k, v in out.items()).encode() + b"\r\n"
+                             + (body if method != "HEAD" else b""))
+                await writer.drain()
+                if not self.quiet:
+                    print(f"  {method} {target} {status} {len(body)}B {(time.perf_counter() - t) * 1000:.1f}ms"
+                          + (f" {out['X-Cache']}" if "X-Cache" in out else ""))
+                if not keep:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard and a screening API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--data", default=DATA_PATH, help=f"data file to serve (default {DATA_PATH})")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="cached API responses")
+    parser.add_argument("--quiet", action="store_true", help="don't log requests")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    app = Server(args.data, cache_size=args.cache_size, quiet=args.quiet)
+    app.ds = app.ds.refresh()
+    server = await asyncio.start_server(app.handle, args.host, args.port)
+    print(f"🌐 {len(app.ds.stocks)} stocks from {args.data}")
+    print(f"   Dashboard: http://{args.host}:{args.port}/?api=/api/")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
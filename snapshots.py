@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Append-only history of per-run valuation metrics.
+
+Every run appends one fixed-width record per stock to
+data/history/metrics-YYYY.bin (a 16-byte header, then RECORD rows in run
+order). Files are only ever appended to, so each day's commit is a small
+delta for git, and nothing is lost when sp500_data.json is overwritten.
+A range read memory-loads the year files it spans (a full year of the
+S&P 500 is ~15 MB) and masks them by ticker and date in milliseconds.
+
+The same ticker can be recorded twice on one date (a re-run); reads keep
+the record appended last.
+
+Run: python snapshots.py AAPL MSFT [--start 2025-01-01] [--end ...] [--field pe]
+"""
+import argparse, os, re
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+HISTORY_DIR = "data/history"
+MAGIC = b"SP5HIST1"
+FIELDS = ["price", "pe", "forwardPE", "pb", "ps", "peg", "evEbitda", "dividendYield",
+          "marketCap", "discount52w", "valueScore", "pePercentile"]
+RECORD = np.dtype([("ticker", "S16"), ("date", "<i4")] + [(f, "<f8") for f in FIELDS])
+HEADER = np.dtype([("magic", "S8"), ("itemsize", "<u4"), ("reserved", "<u4")])
+FILE_RE = re.compile(r"^metrics-(\d{4})\.bin$")
+
+
+def _day(value):
+    """date / 'YYYY-MM-DD' / YYYYMMDD int -> YYYYMMDD int."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def _path(root, year):
+    return os.path.join(root, f"metrics-{year}.bin")
+
+
+def _header():
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["itemsize"] = RECORD.itemsize
+    return header.tobytes()
+
+
+def _count(path):
+    """Complete records in a year file; raises ValueError on a foreign file."""
+    with open(path, "rb") as f:
+        header = np.frombuffer(f.read(HEADER.itemsize), dtype=HEADER)
+    if len(header) != 1 or header["magic"][0] != MAGIC or header["itemsize"][0] != RECORD.itemsize:
+        raise ValueError(f"{path} is not a metrics history file")
+    return (os.path.getsize(path) - HEADER.itemsize) // RECORD.itemsize
+
+
+def append(stocks, day=None, root=HISTORY_DIR):
+    """Append one record per stock dict for ``day`` (default: today, UTC). Returns the count."""
+    day = _day(day or datetime.now(timezone.utc).date())
+    rows = np.zeros(len(stocks), dtype=RECORD)
+    rows["ticker"] = [s["ticker"].encode() for s in stocks]
+    rows["date"] = day
+    for field in FIELDS:
+        rows[field] = [np.nan if s.get(field) is None else s[field] for s in stocks]
+
+    os.makedirs(root, exist_ok=True)
+    path = _path(root, day // 10000)
+    if os.path.exists(path):
+        # Drop a torn trailing record left by a killed run before appending
+        end = HEADER.itemsize + _count(path) * RECORD.itemsize
+        if os.path.getsize(path) != end:
+            os.truncate(path, end)
+    else:
+        with open(path, "wb") as f:
+            f.write(_header())
+    with open(path, "ab") as f:
+        f.write(rows.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    return len(rows)
+
+
+def read(tickers=None, start=None, end=None, root=HISTORY_DIR):
+    """Records for ``tickers`` (all if None) with start <= date <= end, sorted by (ticker, date)."""
+    lo = _day(start) if start else 0
+    hi = _day(end) if end else 99991231
+    parts = []
+    for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        m = FILE_RE.match(name)
+        if not m or not lo // 10000 <= int(m.group(1)) <= hi // 10000:
+            continue
+        path = os.path.join(root, name)
+        parts.append(np.fromfile(path, dtype=RECORD, count=_count(path), offset=HEADER.itemsize))
+    data = np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)
+
+    mask = (data["date"] >= lo) & (data["date"] <= hi)
+    if tickers is not None:
+        mask &= np.isin(data["ticker"], np.array([t.encode() for t in tickers], dtype="S16"))
+    data = data[mask]
+    # Stable sort by (ticker, date) keeps append order within a day; keep the last
+    order = np.lexsort((data["date"], data["ticker"]))
+    data = data[order]
+    last = np.ones(len(data), dtype=bool)
+    last[:-1] = (data["ticker"][1:] != data["ticker"][:-1]) | (data["date"][1:] != data["date"][:-1])
+    return data[last]
+
+
+def monthly(tickers, field="pe", start=None, end=None, root=HISTORY_DIR):
+    """Last recorded ``field`` per calendar month: {ticker: (month indices, values)}.
+
+    Month indices are year * 12 + month - 1 (analytics.month_index); NaN
+    values are skipped.
+    """
+    data = read(tickers, start, end, root)
+    data = data[~np.isnan(data[field])]
+    months = (data["date"] // 10000) * 12 + (data["date"] // 100) % 100 - 1
+    last = np.ones(len(data), dtype=bool)
+    last[:-1] = (data["ticker"][1:] != data["ticker"][:-1]) | (months[1:] != months[:-1])
+    data, months = data[last], months[last]
+    names, starts = np.unique(data["ticker"], return_index=True)
+    bounds = list(starts[1:]) + [len(data)]
+    return {n.decode(): (months[a:b], data[field][a:b]) for n, a, b in zip(names, starts, bounds)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read the per-run metrics history.")
+    parser.add_argument("tickers", nargs="*", help="tickers to show (default: all)")
+    parser.add_argument("--start", help="first date, YYYY-MM-DD")
+    parser.add_argument("--end", help="last date, YYYY-MM-DD")
+    parser.add_argument("--field", action="append", choices=FIELDS,
+                        help="field to show (repeatable; default pe, pb, valueScore)")
+    parser.add_argument("--root", default=HISTORY_DIR)
+    args = parser.parse_args(argv)
+
+    fields = args.field or ["pe", "pb", "valueScore"]
+    rows = read(args.tickers or None, args.start, args.end, args.root)
+    print("ticker".ljust(10) + "date".ljust(12) + "".join(f.rjust(14) for f in fields))
+    for r in rows:
+        d = int(r["date"])
+        print(r["ticker"].decode().ljust(10) + f"{d // 10000}-{d // 100 % 100:02d}-{d % 100:02d}".ljust(12)
+              + "".join(("-" if np.isnan(r[f]) else f"{r[f]:g}").rjust(14) for f in fields))
+    print(f"\n{len(rows)} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - SQLite screener store.
+
+Keeps every run's stock rows in data/screener.db, one row per (date,
+ticker), next to per-date sector averages, so screens can be run as
+indexed SQL over the current snapshot or any range of past ones (see
+screen.py). The database is derived data: fetch_data.py loads each run
+into it, and any dates it is missing are backfilled from the binary
+history in data/history (snapshots.py), so it can be deleted and rebuilt
+at any time.
+
+Run: python store.py [--rebuild]
+"""
+import argparse, json, os, sqlite3, time
+from contextlib import closing
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+
+import snapshots
+
+KST = timezone(timedelta(hours=9))
+DB_PATH = "data/screener.db"
+DATA_PATH = "data/sp500_data.json"
+TEXT_FIELDS = ["ticker", "name", "sector"]
+NUM_FIELDS = ["price", "marketCap", "pe", "forwardPE", "pb", "ps", "peg", "evEbitda", "dividendYield",
+              "roe", "high52w", "low52w", "discount52w", "valueScore", "pePercentile", "peRank"]
+SECTOR_FIELDS = ["avgPE", "avgPB", "count"]
+INDEXED = ["sector", "valueScore", "pe", "pePercentile"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS stocks (
+    date TEXT NOT NULL,
+    ticker TEXT NOT NULL, name TEXT, sector TEXT,
+    {", ".join(f'"{f}" REAL' for f in NUM_FIELDS)},
+    PRIMARY KEY (date, ticker)
+);
+CREATE TABLE IF NOT EXISTS sectors (
+    date TEXT NOT NULL, sector TEXT NOT NULL,
+    avgPE REAL, avgPB REAL, count INTEGER,
+    PRIMARY KEY (date, sector)
+);
+{"".join(f'CREATE INDEX IF NOT EXISTS stocks_{f} ON stocks (date, "{f}");' for f in INDEXED)}
+"""
+
+# Same validity bands as fetch_data.aggregate, left unrounded for comparisons
+SECTOR_SQL = """
+INSERT OR REPLACE INTO sectors
+SELECT date, sector,
+       AVG(CASE WHEN pe > 0 AND pe < 500 THEN pe END),
+       AVG(CASE WHEN pb > 0 AND pb < 200 THEN pb END),
+       COUNT(*)
+FROM stocks WHERE date = ? GROUP BY sector
+"""
+
+
+def _iso(day):
+    """YYYYMMDD int -> 'YYYY-MM-DD'."""
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+
+def _run_day(output):
+    """UTC date of the run that wrote a data file, from its KST "lastUpdated" stamp."""
+    stamp = datetime.strptime(output["lastUpdated"], "%Y.%m.%d %H:%M KST").replace(tzinfo=KST)
+    return stamp.astimezone(timezone.utc).date()
+
+
+def connect(path=DB_PATH):
+    """Open (and if needed create) the store."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def _insert(db, day, rows):
+    fields = ["date"] + TEXT_FIELDS + NUM_FIELDS
+    sql = f"INSERT OR REPLACE INTO stocks ({', '.join(repr(f) for f in fields)}) VALUES ({', '.join('?' * len(fields))})"
+    db.executemany(sql, ([day] + [r.get(f) for f in TEXT_FIELDS + NUM_FIELDS] for r in rows))
+    db.execute(SECTOR_SQL, (day,))
+
+
+def load(stocks, day=None, path=DB_PATH):
+    """Replace the rows for ``day`` (default: today, UTC, as snapshots.append) with ``stocks``."""
+    day = _iso(snapshots._day(day or datetime.now(timezone.utc).date()))
+    with closing(connect(path)) as db, db:
+        db.execute("DELETE FROM stocks WHERE date = ?", (day,))
+        db.execute("DELETE FROM sectors WHERE date = ?", (day,))
+        _insert(db, day, stocks)
+    return len(stocks)
+
+
+def sync(path=DB_PATH, root=snapshots.HISTORY_DIR):
+    """Backfill dates recorded in the snapshot history but missing from the store.
+
+    Snapshots carry no names or sectors; those come from each ticker's
+    latest stored row. Returns the number of dates added.
+    """
+    data = snapshots.read(root=root)
+    if not len(data):
+        return 0
+    with closing(connect(path)) as db, db:
+        have = {r[0] for r in db.execute("SELECT DISTINCT date FROM stocks")}
+        labels = {}
+        for r in db.execute("SELECT ticker, name, sector FROM stocks ORDER BY date"):
+            labels[r["ticker"]] = (r["name"], r["sector"])
+        days = [d for d in np.unique(data["date"]).tolist() if _iso(d) not in have]
+        for d in days:
+            part = data[data["date"] == d]
+            rows = []
+            for rec in part:
+                ticker = rec["ticker"].decode()
+                name, sector = labels.get(ticker, (None, None))
+                row = {"ticker": ticker, "name": name, "sector": sector}
+                row.update({f: None if np.isnan(rec[f]) else float(rec[f]) for f in snapshots.FIELDS})
+                rows.append(row)
+            _insert(db, _iso(d), rows)
+    return len(days)
+
+
+def rebuild(path=DB_PATH, data_path=DATA_PATH, root=snapshots.HISTORY_DIR):
+    """Recreate the store from the published data file and the snapshot history."""
+    if os.path.exists(path):
+        os.remove(path)
+    days = snapshots.read(root=root)["date"]
+    with open(data_path) as f:
+        output = json.load(f)
+    # The data file is the latest run, which is also the latest snapshot
+    load(output["stocks"], int(days.max()) if len(days) else _run_day(output), path)
+    return sync(path, root) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create or refresh the SQLite screener store.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--rebuild", action="store_true",
+                        help=f"recreate from {DATA_PATH} and the snapshot history")
+    args = parser.parse_args(argv)
+
+    t = time.time()
+    added = rebuild(args.db) if args.rebuild else sync(args.db)
+    with closing(connect(args.db)) as db:
+        dates, rows = db.execute("SELECT COUNT(DISTINCT date), COUNT(*) FROM stocks").fetchone()
+    print(f"🗄️  {args.db}: {added} dates added, {dates} dates / {rows} rows ({time.time() - t:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - Run telemetry.
+
+Every measured operation becomes one event: a Yahoo request (batch
+download, per-ticker info or history), a whole ticker including its
+retries, or a pipeline stage ("run.*"). Events carry the latency, retry
+count, bytes received, time queued on the rate limiter (waitMs) and the
+error class if it failed. They are written as JSON lines, plus a summary
+with p50/p95/p99 per stage, the error classes and the tickers that ate the
+most time. A merge run folds the summaries of the shard runs into its own.
+"""
+import json, os, threading, time
+from contextlib import contextmanager
+
+REPORT_PATH = "data/run_report.jsonl"
+SUMMARY_PATH = "data/run_summary.json"
+SLOWEST = 10
+
+
+def payload_bytes(obj):
+    """Approximate size of a decoded response.
+
+    yfinance does not expose raw HTTP bodies, so dicts count as their JSON
+    encoding and pandas objects as their in-memory size.
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, dict):
+        return len(json.dumps(obj, default=str).encode())
+    if hasattr(obj, "memory_usage"):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    return 0
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def fold(summary, parts):
+    """Add the shard summaries ``parts`` into ``summary`` and return it.
+
+    Stage counts, errors, retries, bytes, waitMs and totalMs add up and maxMs
+    is the largest. Percentiles cannot be pooled from summaries, so a stage's
+    p50/p95/p99 become the largest of the runs', an upper bound on the
+    pooled value. Error classes and slowest tickers are pooled, and
+    ``shards`` keeps each part's startedAt, wallMs and event count.
+    """
+    stages, errors = summary["stages"], summary["errors"]
+    slowest = list(summary["slowestTickers"])
+    for part in parts:
+        summary["events"] += part["events"]
+        for stage, st in part["stages"].items():
+            if stage not in stages:
+                stages[stage] = dict(st)
+                continue
+            into = stages[stage]
+            for key in ("count", "errors", "retries", "bytes"):
+                into[key] += st[key]
+            for key in ("waitMs", "totalMs"):
+                into[key] = round(into[key] + st[key], 3)
+            for key in ("p50Ms", "p95Ms", "p99Ms", "maxMs"):
+                into[key] = max(into[key], st[key])
+        for name, n in part["errors"].items():
+            errors[name] = errors.get(name, 0) + n
+        slowest += part["slowestTickers"]
+    summary["slowestTickers"] = sorted(slowest, key=lambda t: -t["ms"])[:SLOWEST]
+    summary["shards"] = [{k: part[k] for k in ("startedAt", "wallMs", "events")} for part in parts]
+    return summary
+
+
+class Telemetry:
+    """Thread-safe in-memory event log for one run."""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.clock = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage, ticker=None, **fields):
+        """Time the block as one event; yields the event so callers can add fields.
+
+        An exception escaping the block is recorded by class and re-raised.
+        """
+        event = {"stage": stage, "ticker": ticker, "ms": None, "retries": 0,
+                 "bytes": 0, "error": None, **fields}
+        start = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event["error"] = event["error"] or type(e).__name__
+            raise
+        finally:
+            event["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.record(event)
+
+    def record(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def add(self, stage, seconds, **fields):
+        """Record an event timed elsewhere."""
+        self.record({"stage": stage, "ticker": None, "ms": round(seconds * 1000, 3),
+                     "retries": 0, "bytes": 0, "error": None, **fields})
+
+    def summary(self):
+        """Per-stage latency percentiles and totals, error classes, slowest tickers."""
+        with self.lock:
+            events = list(self.events)
+        stages, errors, per_ticker = {}, {}, {}
+        for e in events:
+            stages.setdefault(e["stage"], []).append(e)
+            if e["error"]:
+                errors[e["error"]] = errors.get(e["error"], 0) + 1
+            if e["ticker"] and e["stage"] == "ticker":
+                per_ticker[e["ticker"]] = per_ticker.get(e["ticker"], 0) + e["ms"]
+
+        by_stage = {}
+        for stage, group in stages.items():
+            ms = sorted(e["ms"] for e in group)
+            by_stage[stage] = {
+                "count": len(group),
+                "errors": sum(1 for e in group if e["error"]),
+                "retries": sum(e["retries"] for e in group),
+                "bytes": sum(e["bytes"] for e in group),
+                "waitMs": round(sum(e.get("waitMs", 0) for e in group), 3),
+                "totalMs": round(sum(ms), 3),
+                "p50Ms": percentile(ms, 50),
+                "p95Ms": percentile(ms, 95),
+                "p99Ms": percentile(ms, 99),
+                "maxMs": ms[-1],
+            }
+        slowest = sorted(per_ticker.items(), key=lambda kv: -kv[1])[:SLOWEST]
+        return {
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "wallMs": round((time.perf_counter() - self.clock) * 1000, 3),
+            "events": len(events),
+            "stages": by_stage,
+            "errors": errors,
+            "slowestTickers": [{"ticker": t, "ms": round(ms, 3)} for t, ms in slowest],
+        }
+
+    def write(self, report_path=REPORT_PATH, summary_path=SUMMARY_PATH, parts=()):
+        """Write the JSON-lines event log and the summary, with ``parts`` folded in; returns the summary."""
+        summary = fold(self.summary(), parts) if parts else self.summary()
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with self.lock:
+            events = list(self.events)
+        with open(report_path, "w", encoding="utf-8") as f:
+            for e in events:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+        os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
@@ -0,0 +1,4 @@
+"""Tests import the flat modules from the repo root, as the scripts do when run from it."""
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
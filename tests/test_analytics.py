@@ -0,0 +1,84 @@
+"""build_records against the per-ticker code the analytics stage replaced."""
+from datetime import datetime
+
+import pytest
+
+import analytics
+import generate_sample
+
+
+# ─── Reference: the per-ticker functions from fetch_data.py before analytics.py ───
+def percentile_in_history(pe, pe_history):
+    if pe and pe_history and len(pe_history) >= 3:
+        all_pes = [p["pe"] for p in pe_history if p["pe"] > 0]
+        if all_pes:
+            below = sum(1 for p in all_pes if p < pe)
+            return round(below / len(all_pes) * 100)
+    return None
+
+
+def historical_performance(pe, pe_history):
+    if not (pe and pe_history and len(pe_history) >= 5):
+        return None
+    cases = []
+    for i, ph in enumerate(pe_history[:-1]):
+        if abs(ph["pe"] - pe) / pe < 0.15 and i + 2 < len(pe_history):
+            p_end = pe_history[i + 2]["pe"]
+            ret = round((p_end / ph["pe"] - 1) * 100, 1)
+            cases.append({"date": ph["date"], "pe": ph["pe"], "return6m": ret})
+    if not cases:
+        return None
+    returns = [c["return6m"] for c in cases]
+    return {
+        "similarCount": len(cases),
+        "avg6mReturn": round(sum(returns) / len(returns), 1),
+        "winRate": round(sum(1 for r in returns if r > 0) / len(returns) * 100),
+        "cases": cases[:6],
+    }
+
+
+def compute_value_score(pe, fwd_pe, pb, ps, peg, discount52w):
+    if not (pe and pe > 0):
+        return None
+    scores = []
+    if pe: scores.append(max(0, min(100, 100 - (pe / 50 * 100))))
+    if fwd_pe: scores.append(max(0, min(100, 100 - (fwd_pe / 40 * 100))))
+    if pb: scores.append(max(0, min(100, 100 - (pb / 20 * 100))))
+    if ps: scores.append(max(0, min(100, 100 - (ps / 15 * 100))))
+    if peg and peg > 0: scores.append(max(0, min(100, 100 - (peg / 3 * 100))))
+    if discount52w is not None: scores.append(max(0, min(100, 50 + abs(discount52w) * (1 if discount52w < 0 else -1))))
+    return round(sum(scores) / len(scores)) if scores else None
+
+
+# ─── Tests ───
+NOW = datetime(2026, 5, 15)
+
+
+@pytest.fixture(scope="module", params=[1, 2, 3])
+def built(request):
+    items = generate_sample.gen_items(generate_sample.universe(3000), null_rate=0.05, outlier_rate=0.02,
+                                      seed=request.param, now=NOW)
+    return items, analytics.build_records(items, now=NOW)
+
+
+def test_percentile_matches_per_ticker_code(built):
+    items, records = built
+    bad = [r["ticker"] for r in records if percentile_in_history(r["pe"], r["peHistory"]) != r["pePercentile"]]
+    assert bad == []
+
+
+def test_historical_performance_matches_per_ticker_code(built):
+    items, records = built
+    bad = [r["ticker"] for r in records if historical_performance(r["pe"], r["peHistory"]) != r["histPerformance"]]
+    assert bad == []
+
+
+def test_value_score_matches_per_ticker_code(built):
+    items, records = built
+    bad = []
+    for item, r in zip(items, records):
+        x = item["inputs"]
+        if compute_value_score(x["pe"], x["forwardPE"], x["pb"], x["ps"], x["peg"], r["discount52w"]) != r["valueScore"]:
+            bad.append(r["ticker"])
+    assert bad == []
+
@@ -0,0 +1,76 @@
+"""artifacts.diff_index / apply_delta: a delta rebuilds the new index exactly."""
+import json, os
+
+import pytest
+
+import artifacts
+
+
+def row(ticker, sector="Energy", pe=10.0, **fields):
+    return {"ticker": ticker, "name": ticker.title(), "sector": sector, "pe": pe, **fields}
+
+
+def index(*stocks, **meta):
+    return {"lastUpdated": "2026.08.21 07:25 KST", "summary": {"totalStocks": len(stocks)}, **meta,
+            "stocks": list(stocks)}
+
+
+OLD = index(row("AAA"), row("BBB", pe=None), row("CCC", "Utilities", histPerformance={"winRate": 50}))
+
+CASES = {
+    "unchanged": OLD,
+    "field changes": index(row("AAA", pe=11.5), row("BBB", pe=3.0),
+                           row("CCC", "Utilities", histPerformance=None)),
+    "field added": index(row("AAA", peg=1.2), OLD["stocks"][1], OLD["stocks"][2]),
+    "added and removed": index(row("AAA"), row("CCC", "Utilities", histPerformance={"winRate": 50}),
+                               row("DDD", pe=7.0)),
+    "reordered": index(OLD["stocks"][2], OLD["stocks"][0], OLD["stocks"][1]),
+    "added mid-list": index(row("AAA"), row("DDD"), OLD["stocks"][1], OLD["stocks"][2]),
+    "emptied": index(),
+    "meta only": index(*OLD["stocks"], lastUpdated="2026.08.22 07:25 KST"),
+}
+
+
+@pytest.mark.parametrize("new", CASES.values(), ids=CASES.keys())
+def test_round_trip(new):
+    delta = artifacts.diff_index(OLD, new)
+    assert artifacts.apply_delta(OLD, delta) == new
+    # What the browser applies is the delta after a trip through JSON
+    assert artifacts.apply_delta(OLD, json.loads(json.dumps(delta))) == new
+
+
+def test_delta_carries_only_differences():
+    delta = artifacts.diff_index(OLD, CASES["field changes"])
+    assert delta["changed"] == {"AAA": {"pe": 11.5}, "BBB": {"pe": 3.0}, "CCC": {"histPerformance": None}}
+    assert delta["added"] == {} and delta["removed"] == []
+    assert "order" not in delta
+
+
+def test_order_is_sent_only_when_not_implied():
+    assert "order" not in artifacts.diff_index(OLD, CASES["added and removed"])
+    assert artifacts.diff_index(OLD, CASES["reordered"])["order"] == ["CCC", "AAA", "BBB"]
+    assert artifacts.diff_index(OLD, CASES["added mid-list"])["order"] == ["AAA", "DDD", "BBB", "CCC"]
+
+
+def test_apply_does_not_touch_the_old_index():
+    before = json.loads(json.dumps(OLD))
+    artifacts.apply_delta(OLD, artifacts.diff_index(OLD, CASES["field changes"]))
+    assert OLD == before
+
+
+def test_write_split_publishes_a_delta_chain(tmp_path):
+    out = str(tmp_path)
+    artifacts.write_split(OLD, out)
+    first, first_hash = artifacts.read_index(out)
+    artifacts.write_split(CASES["added and removed"], out)
+    second, second_hash = artifacts.read_index(out)
+
+    chain = artifacts.load_manifest(out)["deltas"]
+    assert [(d["from"], d["to"]) for d in chain] == [(first_hash, second_hash)]
+    with open(os.path.join(out, chain[0]["path"]), encoding="utf-8") as f:
+        delta = json.load(f)
+    assert artifacts.apply_delta(first, delta) == second
+
+    # Data that does not continue the previous index publishes no delta
+    artifacts.write_split(OLD, out, deltas=False)
+    assert artifacts.load_manifest(out)["deltas"] == []
@@ -0,0 +1,58 @@
+"""registry: membership as of a date, and the dates load() refuses."""
+from datetime import date
+
+import pytest
+
+import registry
+
+CSV = """ticker,name,sector,subIndustry,added,removed
+OLD,Old Co,Energy,Oil & Gas Drilling,,2019-03-18
+NEW,New Co,Energy,Oil & Gas Drilling,2020-6-22,
+BACK,Back Co,Utilities,Electric Utilities,2010-01-04,2015-09-21
+BACK,Back Co,Utilities,Electric Utilities,2018-01-02,
+"""
+
+
+@pytest.fixture
+def universe(tmp_path):
+    path = tmp_path / "idx.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return registry.load(str(path))
+
+
+@pytest.mark.parametrize("on, members", [
+    ("2014-01-01", ["OLD", "BACK"]),
+    ("2016-01-01", ["OLD"]),
+    ("2019-03-17", ["OLD", "BACK"]),
+    ("2019-03-18", ["BACK"]),             # removed on the day
+    ("2020-06-21", ["BACK"]),
+    ("2020-06-22", ["NEW", "BACK"]),      # added on the day, '2020-6-22' in the file
+    (date(2030, 1, 1), ["NEW", "BACK"]),
+])
+def test_members_as_of(universe, on, members):
+    assert list(universe.members(on)) == members
+
+
+def test_sector_and_sub_industry_as_of(universe):
+    assert list(universe.sector("Energy", "2019-01-01")) == ["OLD"]
+    assert list(universe.sub_industry("Oil & Gas Drilling", "2021-01-01")) == ["NEW"]
+    assert universe.sector("Utilities", "2016-01-01") == {}
+
+
+def test_dates_are_normalized(universe):
+    assert universe.get("NEW")["added"] == "2020-06-22"
+    assert universe.get("BACK")["added"] == "2018-01-02"
+    assert len(universe) == 3
+
+
+@pytest.mark.parametrize("row, message", [
+    ("X,x,Energy,,2020-02-30,", "line 2: added '2020-02-30' is not a YYYY-MM-DD date"),
+    ("X,x,Energy,,,06/30/2020", "line 2: removed '06/30/2020' is not a YYYY-MM-DD date"),
+    ("X,x,Energy,,2020-06-30,2020-06-30", "line 2: removed 2020-06-30 is not after added 2020-06-30"),
+])
+def test_load_rejects_bad_dates(tmp_path, row, message):
+    path = tmp_path / "bad.csv"
+    path.write_text(f"{','.join(registry.COLUMNS)}\n{row}\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=message) as e:
+        registry.load(str(path))
+    assert str(path) in str(e.value)
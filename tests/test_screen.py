@@ -0,0 +1,59 @@
+"""screen.compile_where: what it accepts, and that malformed filters never reach SQLite."""
+import re, sqlite3
+
+import pytest
+
+import screen
+
+
+@pytest.mark.parametrize("expr, sql, params", [
+    ("pe < 15", 's."pe" < ?', [15.0]),
+    ("pe < sector avgPE and discount52w < -20", 's."pe" < g.avgPE AND s."discount52w" < - ?', [20.0]),
+    ("sector.avgPE > pe", 'g.avgPE > s."pe"', []),
+    ("(pe < 10 or pb <= 1) and not peg > 2", '( s."pe" < ? OR s."pb" <= ? ) AND NOT s."peg" > ?', [10.0, 1.0, 2.0]),
+    ("pe is not null", 's."pe" IS NOT NULL', []),
+    ("pe between 1 and 5", 's."pe" BETWEEN ? AND ?', [1.0, 5.0]),
+    ("sector in ('Energy', 'Utilities')", 's."sector" IN ( ? , ? )', ["Energy", "Utilities"]),
+    ("pe * 2 < pb", 's."pe" * ? < s."pb"', [2.0]),
+])
+def test_compiles(expr, sql, params):
+    assert screen.compile_where(expr) == (sql, params)
+
+
+@pytest.mark.parametrize("expr, rest", [
+    ("pe <", "<"),
+    ("< 5", "< 5"),
+    ("pe < and pb > 1", "< and pb > 1"),
+    ("pe * < 3", "* < 3"),
+    ("pe < 5 and", "and"),
+    ("(pe < 10", "(pe < 10"),
+    ("pe < 10)", ")"),
+    (")(", ")("),
+    ("pe 10", "10"),
+    ("pe pb", "pb"),
+    ("pe is null pb", "pb"),
+    ("pe < 10 (", "("),
+    ("pe ; drop", " ; drop"),
+])
+def test_rejects_malformed(expr, rest):
+    with pytest.raises(ValueError, match=re.escape(f"cannot parse {rest!r}")):
+        screen.compile_where(expr)
+
+
+@pytest.mark.parametrize("expr, message", [
+    ("price_to_book < 1", "unknown field"),
+    ("sector.avgXY > 1", "unknown sector field"),
+])
+def test_rejects_unknown_names(expr, message):
+    with pytest.raises(ValueError, match=message):
+        screen.compile_where(expr)
+
+
+def test_compiled_filters_are_valid_sql():
+    db = sqlite3.connect(":memory:")
+    db.execute('CREATE TABLE s ("pe", "pb", "peg", "discount52w", "sector")')
+    db.execute("CREATE TABLE g (avgPE)")
+    for expr in ["(pe < 10 or pb <= 1) and not peg > 2", "pe < sector avgPE and discount52w < -20",
+                 "pe * 2 < pb", "pe is not null"]:
+        sql, params = screen.compile_where(expr)
+        db.execute(f"SELECT * FROM s, g WHERE {sql}", params)
@@ -0,0 +1,84 @@
+"""telemetry.fold: shard summaries folded into a merge run's summary."""
+import json, random
+
+import telemetry
+from telemetry import Telemetry
+
+
+def run(events):
+    t = Telemetry()
+    for stage, ticker, ms, extra in events:
+        t.record({"stage": stage, "ticker": ticker, "ms": ms, "retries": extra.get("retries", 0),
+                  "bytes": extra.get("bytes", 0), "error": extra.get("error"),
+                  **({"waitMs": extra["waitMs"]} if "waitMs" in extra else {})})
+    return t
+
+
+def shard_events(seed, n=40):
+    r = random.Random(seed)
+    events = []
+    for i in range(n):
+        ticker = f"T{seed}{i:02d}"
+        events.append(("info", ticker, round(r.uniform(1, 300), 3),
+                       {"retries": r.randint(0, 2), "bytes": r.randint(100, 900), "waitMs": round(r.uniform(0, 5), 3),
+                        "error": r.choice([None, None, None, "YFRateLimitError", "HTTPError"])}))
+        events.append(("ticker", ticker, round(r.uniform(10, 900), 3), {}))
+    events.append(("download", None, round(r.uniform(50, 500), 3), {"bytes": 5000}))
+    return events
+
+
+def test_additive_totals_match_the_pooled_run():
+    shards = [shard_events(seed) for seed in (1, 2, 3)]
+    merge = [("run.merge", None, 12.5, {})]
+    folded = telemetry.fold(run(merge).summary(), [run(e).summary() for e in shards])
+    pooled = run(merge + [e for events in shards for e in events]).summary()
+
+    assert folded["events"] == pooled["events"]
+    assert folded["errors"] == pooled["errors"]
+    assert folded["stages"].keys() == pooled["stages"].keys()
+    for stage, st in pooled["stages"].items():
+        into = folded["stages"][stage]
+        for key in ("count", "errors", "retries", "bytes", "maxMs"):
+            assert into[key] == st[key], (stage, key)
+        for key in ("waitMs", "totalMs"):
+            assert abs(into[key] - st[key]) < 1e-6, (stage, key)
+        # Percentiles cannot be pooled; the largest shard value bounds the pooled one
+        for key in ("p50Ms", "p95Ms", "p99Ms"):
+            assert into[key] >= st[key], (stage, key)
+    assert folded["slowestTickers"] == pooled["slowestTickers"]
+
+
+def test_percentiles_take_the_largest_part():
+    parts = [run([("info", "A", ms, {}) for ms in (1, 2, 3)]).summary(),
+             run([("info", "B", ms, {}) for ms in (10, 20, 900)]).summary()]
+    folded = telemetry.fold(run([]).summary(), parts)
+    assert {k: folded["stages"]["info"][k] for k in ("p50Ms", "p99Ms", "maxMs", "count")} == \
+        {"p50Ms": 20, "p99Ms": 900, "maxMs": 900, "count": 6}
+
+
+def test_parts_are_not_modified_and_shards_are_listed():
+    parts = [run(shard_events(seed, n=5)).summary() for seed in (4, 5)]
+    before = json.loads(json.dumps(parts))
+    summary = run([("info", "X", 1.0, {})]).summary()
+    folded = telemetry.fold(summary, parts)
+    folded["stages"]["ticker"]["count"] += 100
+    assert parts == before
+    assert folded["shards"] == [{k: p[k] for k in ("startedAt", "wallMs", "events")} for p in parts]
+
+
+def test_slowest_tickers_keep_the_top_across_parts():
+    parts = [run([("ticker", f"S{s}{i}", float(s * 100 + i), {}) for i in range(telemetry.SLOWEST)]).summary()
+             for s in (1, 2)]
+    folded = telemetry.fold(run([]).summary(), parts)
+    assert [t["ticker"] for t in folded["slowestTickers"]] == [f"S2{i}" for i in reversed(range(telemetry.SLOWEST))]
+
+
+def test_write_folds_parts(tmp_path):
+    part = run(shard_events(6, n=3)).summary()
+    t = run([("run.merge", None, 5.0, {})])
+    summary = t.write(str(tmp_path / "report.jsonl"), str(tmp_path / "summary.json"), parts=[part])
+    with open(tmp_path / "summary.json", encoding="utf-8") as f:
+        assert json.load(f) == summary
+    assert summary["events"] == 1 + part["events"]
+    with open(tmp_path / "report.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
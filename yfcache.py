@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+S&P 500 Value Screener - On-disk TTL cache for yfinance responses.
+
+Entries live under .cache/yfinance/<aa>/<sha256>.json, named by the SHA-256
+of the request key (kind, ticker, params), one JSON document per entry.
+Ticker.info is split into field groups that expire at different speeds, so a
+caller that only needs slow-moving fundamentals can keep serving them long
+after the quote fields went stale (fetch_data rebuilds those from a bulk
+daily download). The directory is size-bounded with LRU eviction (file
+mtime = last use), and offline mode serves whatever is on disk regardless
+of age.
+"""
+import hashlib, json, os, threading, time
+
+DEFAULT_DIR = ".cache/yfinance"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Ticker.info field groups: name -> (ttl seconds, fields). "profile" takes
+# every field not listed elsewhere.
+INFO_GROUPS = {
+    "quote": (HOUR, [
+        "currentPrice", "regularMarketPrice", "marketCap", "trailingPE", "forwardPE",
+        "fiftyTwoWeekHigh", "fiftyTwoWeekLow",
+    ]),
+    "valuation": (DAY, [
+        "priceToBook", "priceToSalesTrailing12Months", "pegRatio", "enterpriseToEbitda",
+        "dividendYield",
+    ]),
+    "fundamentals": (7 * DAY, [
+        "trailingEps", "forwardEps", "sharesOutstanding", "bookValue", "revenuePerShare",
+        "returnOnEquity", "earningsTimestamp", "mostRecentQuarter",
+    ]),
+    "profile": (30 * DAY, None),
+}
+ALL_GROUPS = tuple(INFO_GROUPS)
+SLOW_GROUPS = tuple(g for g in INFO_GROUPS if g != "quote")
+HISTORY_TTL = 12 * HOUR
+
+
+class CacheMiss(KeyError):
+    """Raised in offline mode when a request has no cached entry."""
+
+
+class YFCache:
+    """Size-bounded, TTL-aware disk cache in front of yf.Ticker calls."""
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.Lock()
+        self._index = None  # path -> size, built lazily on first write
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ─── Low-level entries ───
+    def _path(self, key):
+        digest = hashlib.sha256(json.dumps(key, separators=(",", ":")).encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + ".json")
+
+    def get(self, key, ttl):
+        """Cached value for ``key`` if younger than ``ttl`` (any age offline), else None."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self.offline and time.time() - entry["storedAt"] > ttl:
+            return None
+        try:
+            os.utime(path)  # mark as recently used for LRU eviction
+        except OSError:
+            pass
+        return entry["value"]
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"key": key, "storedAt": time.time(), "value": value}, ensure_ascii=False)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._account(path, os.path.getsize(path))
+
+    def _account(self, path, size):
+        with self.lock:
+            if self._index is None:
+                self._index = {}
+                for dirpath, _, files in os.walk(self.root):
+                    for name in files:
+                        if name.endswith(".json"):
+                            p = os.path.join(dirpath, name)
+                            self._index[p] = os.path.getsize(p)
+                self._total = sum(self._index.values())
+            else:
+                self._total += size - self._index.get(path, 0)
+                self._index[path] = size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is at 90% of its bound."""
+        by_age = []
+        for p in self._index:
+            try:
+                by_age.append((os.path.getmtime(p), p))
+            except OSError:
+                by_age.append((0, p))
+        by_age.sort()
+        for _, p in by_age:
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+            self._total -= self._index.pop(p)
+
+    def _miss(self, key):
+        self.misses += 1
+        if self.offline:
+            raise CacheMiss(f"offline and not cached: {key[0]} {key[1]}")
+
+    # ─── yfinance responses ───
+    def info(self, ticker, fetch, groups=ALL_GROUPS):
+        """Ticker.info, served from cache when every requested field group is fresh.
+
+        Otherwise ``fetch()`` is called for the full dict and every group is
+        re-stored with a new timestamp.
+        """
+        merged = {}
+        for group in groups:
+            value = self.get(("info", ticker, group), INFO_GROUPS[group][0])
+            if value is None:
+                break
+            merged.update(value)
+        else:
+            self.hits += 1
+            return merged
+
+        self._miss(("info", ticker))
+        info = fetch()
+        listed = set()
+        for group, (_, fields) in INFO_GROUPS.items():
+            if fields is None:
+                continue
+            listed.update(fields)
+            self.put(("info", ticker, group), {k: info[k] for k in fields if k in info})
+        self.put(("info", ticker, "profile"), {k: v for k, v in info.items() if k not in listed})
+        return info
+
+    def fresh(self, ticker, groups):
+        """Whether every requested info group of ``ticker`` is cached and within its TTL."""
+        return all(self.get(("info", ticker, g), INFO_GROUPS[g][0]) is not None for g in groups)
+
+    def closes(self, ticker, period, interval):
+        """Cached Close series for a history request, or None."""
+        value = self.get(("history", ticker, period, interval), HISTORY_TTL)
+        if value is None:
+            return None
+        import pandas as pd
+        self.hits += 1
+        return pd.Series(value["close"], index=pd.to_datetime(value["index"]), dtype="float64", name=ticker)
+
+    def put_closes(self, ticker, period, interval, series):
+        series = series.dropna()
+        self.put(("history", ticker, period, interval), {
+            "index": [d.isoformat() for d in series.index],
+            "close": [float(v) for v in series.to_numpy()],
+        })
+
+    def history_miss(self, ticker, period, interval):
+        """Count a history miss; raises CacheMiss in offline mode."""
+        self._miss(("history", ticker, period, interval))